@@ -0,0 +1,122 @@
+# alert_aggregator.py
+
+import queue
+import re
+import time
+from collections import Counter
+
+from telegram_alert import send_error_alert
+
+SUPPRESS_WINDOW = 300  # seconds before the same error is sent on its own again
+DIGEST_INTERVAL = 60  # seconds between digests of suppressed repeats
+MAX_STOCKS_LISTED = 5
+
+_VOLATILE = re.compile(r"0x[0-9a-fA-F]+|\d+(\.\d+)?")
+
+
+def report_error(errors, stock_code, exc):
+    # Called from monitor processes; the server owns the aggregator
+    try:
+        errors.put_nowait((stock_code, type(exc).__name__, str(exc)))
+    except queue.Full:
+        pass
+
+
+def fingerprint(error_type, message, stock_code=None):
+    """Same failure on different stocks/values -> same key."""
+    text = message.replace(stock_code, "<stock>") if stock_code else message
+    return error_type, _VOLATILE.sub("#", text)
+
+
+class ErrorAggregator:
+    """Collapses repeated errors into one alert plus periodic digests.
+
+    The first occurrence of a fingerprint is sent right away; repeats within
+    SUPPRESS_WINDOW (from any stock) are only counted and summarised in a
+    digest every DIGEST_INTERVAL seconds.
+    """
+
+    def __init__(
+        self,
+        send=send_error_alert,
+        window=SUPPRESS_WINDOW,
+        digest_interval=DIGEST_INTERVAL,
+        clock=time.time,
+    ):
+        self.send = send
+        self.window = window
+        self.digest_interval = digest_interval
+        self.clock = clock
+        self.last_sent = {}  # fingerprint -> time of last immediate alert
+        self.pending = {}  # fingerprint -> [count, stocks, example message]
+        self.last_digest = clock()
+
+        self.received = Counter()  # fingerprint -> errors seen
+        self.alerts_sent = 0
+        self.digests_sent = 0
+        self.suppressed = 0
+
+    def report(self, error_type, message, stock_code=None):
+        key = fingerprint(error_type, message, stock_code)
+        now = self.clock()
+        self.received[key] += 1
+
+        if now - self.last_sent.get(key, float("-inf")) >= self.window:
+            self.last_sent[key] = now
+            source = f"[{stock_code}] Monitor Error" if stock_code else "[Server Error]"
+            self.send(f"{source}: {error_type}: {message}")
+            self.alerts_sent += 1
+            return True
+
+        entry = self.pending.setdefault(key, [0, set(), message])
+        entry[0] += 1
+        if stock_code:
+            entry[1].add(stock_code)
+        self.suppressed += 1
+        return False
+
+    def drain(self, errors):
+        # Feed everything monitors queued since the last call
+        while True:
+            try:
+                stock_code, error_type, message = errors.get_nowait()
+            except queue.Empty:
+                break
+            self.report(error_type, message, stock_code)
+        return self.flush()
+
+    def flush(self, force=False):
+        now = self.clock()
+        if not self.pending:
+            # Quiet period: the next digest is due an interval after it ends
+            self.last_digest = now
+            return None
+        if not force and now - self.last_digest < self.digest_interval:
+            return None
+
+        lines = [f"🔁 Suppressed errors in the last {now - self.last_digest:.0f}s:"]
+        for (error_type, _), (count, stocks, example) in sorted(
+            self.pending.items(), key=lambda item: -item[1][0]
+        ):
+            names = sorted(stocks)
+            listed = ", ".join(names[:MAX_STOCKS_LISTED])
+            if len(names) > MAX_STOCKS_LISTED:
+                listed += f" +{len(names) - MAX_STOCKS_LISTED}"
+            where = f" on {len(names)} stocks ({listed})" if names else ""
+            lines.append(f"{count}× {error_type}: {example}{where}")
+
+        digest = "\n".join(lines)
+        self.send(digest)
+        self.digests_sent += 1
+        self.pending = {}
+        self.last_digest = now
+        return digest
+
+    def stats(self):
+        return {
+            "errors": sum(self.received.values()),
+            "fingerprints": len(self.received),
+            "alerts_sent": self.alerts_sent,
+            "digests_sent": self.digests_sent,
+            "suppressed": self.suppressed,
+        }
@@ -0,0 +1,248 @@
+# backtest.py
+#
+# Vectorized replay of the live breakout rule over historical minute bars:
+#   python backtest.py [STOCK_CODE ...] [--breakdowns] [--confirm bb,adx] [--out backtest]
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from history import available_codes, load_minute_bars, stack_bars
+from indicator import (
+    INDICATOR_COLUMNS,
+    add_indicators_panel,
+    indicator_params,
+    panel_symbol,
+)
+
+MIN_ROWS = 10  # StockMonitor only evaluates once its window has 10 ticks
+OPENING_RANGE_BARS = 15
+CONFIRMATIONS = ("bb", "adx", "ma", "macd")
+
+
+def breakout_signals(close, resistance, support, breakdowns=False, min_rows=MIN_ROWS):
+    """+1 where check_levels reports a breakout, -1 for a breakdown, else 0.
+
+    is_breakout currently never returns its breakdown branch, so breakdowns
+    are off by default to match what the live monitor would have alerted.
+    """
+    close = np.asarray(close, dtype=float)
+    signals = np.where(close > resistance, 1, 0)
+    if breakdowns:
+        signals = np.where((signals == 0) & (close < support), -1, signals)
+    signals[:min_rows - 1] = 0
+    return signals
+
+
+def confirm_signals(signals, df, config, confirm):
+    """Drop signals the chosen indicators don't confirm.
+
+    Mirrors the (commented-out) checks in is_breakout: "bb" needs the close
+    beyond the band, "adx" needs ADX >= adx.threshold; "ma" and "macd" need
+    the fast MA / MACD histogram on the signal's side. df must already
+    carry the add_indicators columns.
+    """
+    close = df["Close"].to_numpy(dtype=float)
+    long_ok = np.ones(len(df), dtype=bool)
+    short_ok = np.ones(len(df), dtype=bool)
+
+    if "bb" in confirm:
+        long_ok &= close > df["BB_Upper"].to_numpy()
+        short_ok &= close < df["BB_Lower"].to_numpy()
+    if "adx" in confirm:
+        strong = df["ADX"].to_numpy() >= config.get("adx", {}).get("threshold", 25)
+        long_ok &= strong
+        short_ok &= strong
+    if "ma" in confirm:
+        fast, slow = df["MA_Fast"].to_numpy(), df["MA_Slow"].to_numpy()
+        long_ok &= fast > slow
+        short_ok &= fast < slow
+    if "macd" in confirm:
+        hist = df["MACD_Hist"].to_numpy()
+        long_ok &= hist > 0
+        short_ok &= hist < 0
+
+    return np.where(((signals > 0) & long_ok) | ((signals < 0) & short_ok), signals, 0)
+
+
+def rearm_alerts(signals):
+    """Apply the BREAKOUT_STATE re-arm rule without a per-row loop.
+
+    A breakout alerts only if the previous alert wasn't a breakout (and the
+    same for breakdowns), i.e. an alert fires wherever the signal differs
+    from the last non-zero signal before it.
+    """
+    signals = np.asarray(signals)
+    if len(signals) == 0:
+        return signals
+
+    # Index of the last non-zero signal strictly before each row (-1: none)
+    positions = np.where(signals != 0, np.arange(len(signals)), -1)
+    previous_idx = np.concatenate(([-1], np.maximum.accumulate(positions)[:-1]))
+    previous = np.where(previous_idx >= 0, signals[previous_idx], 0)
+
+    fired = (signals != 0) & (signals != previous)
+    return np.where(fired, signals, 0)
+
+
+def trade_legs(alerts):
+    # Long on breakout, short on breakdown; each position is closed by the
+    # next alert (stop-and-reverse) or at the last bar.
+    entry_idx = np.flatnonzero(alerts)
+    exit_idx = np.append(entry_idx[1:], len(alerts) - 1)[: len(entry_idx)]
+    return entry_idx, exit_idx, alerts[entry_idx]
+
+
+def trade_returns(close, alerts):
+    entry_idx, exit_idx, side = trade_legs(alerts)
+    close = np.asarray(close, dtype=float)
+    entry, exit_ = close[entry_idx], close[exit_idx]
+    return side * (exit_ - entry) / entry * 100
+
+
+def trades_from_alerts(df, alerts):
+    entry_idx, exit_idx, side = trade_legs(alerts)
+    close = df["Close"].to_numpy(dtype=float)
+    timestamps = df["Timestamp"].to_numpy()
+
+    return pd.DataFrame(
+        {
+            "Side": np.where(side > 0, "long", "short"),
+            "EntryTime": timestamps[entry_idx],
+            "EntryPrice": close[entry_idx],
+            "ExitTime": timestamps[exit_idx],
+            "ExitPrice": close[exit_idx],
+            "ReturnPct": trade_returns(close, alerts),
+        }
+    )
+
+
+def summarize(returns):
+    equity = np.cumsum(returns)
+    drawdown = equity - np.maximum.accumulate(np.append(0, equity))[1:]
+    return {
+        "Trades": len(returns),
+        "WinRate": float((returns > 0).mean() * 100) if len(returns) else np.nan,
+        "TotalReturnPct": float(returns.sum()),
+        "AvgReturnPct": float(returns.mean()) if len(returns) else np.nan,
+        "MaxDrawdownPct": float(drawdown.min()) if len(returns) else 0.0,
+    }
+
+
+def find_stock(config, stock_code):
+    return next(
+        (s for s in config.get("stocks", []) if s["stock_code"] == stock_code), None
+    )
+
+
+def stock_levels(stock, df):
+    if stock is not None:
+        return stock.get("resistance", 0), stock.get("support", 0), "config"
+
+    # Not configured: fall back to the opening range
+    opening = df.head(OPENING_RANGE_BARS)
+    return opening["High"].max(), opening["Low"].min(), "opening_range"
+
+
+def backtest_stock(
+    df, resistance, support, breakdowns=False, confirm=(), config=None, with_trades=True
+):
+    signals = breakout_signals(df["Close"], resistance, support, breakdowns)
+    if confirm:
+        signals = confirm_signals(signals, df, config or {}, confirm)
+    alerts = rearm_alerts(signals)
+
+    summary = summarize(trade_returns(df["Close"], alerts))
+    summary["Bars"] = len(df)
+    summary["SignalBars"] = int(np.count_nonzero(signals))
+    trades = trades_from_alerts(df, alerts) if with_trades else None
+    return trades, summary
+
+
+def with_indicators(frames, stocks):
+    """add_indicators for every stock, one panel pass per distinct setting."""
+    groups = {}
+    for code in frames:
+        groups.setdefault(indicator_params(stocks[code]), []).append(code)
+
+    out = {}
+    for group in groups.values():
+        panel = stack_bars(
+            {code: frames[code] for code in group}, ("High", "Low", "Close")
+        )
+        result = add_indicators_panel(panel, stocks[group[0]])
+        for code in group:
+            rows = panel_symbol(result, code)
+            out[code] = frames[code].assign(
+                **{column: rows[column].to_numpy() for column in INDICATOR_COLUMNS}
+            )
+    return out
+
+
+def run_backtest(codes=None, config_path="config.json", breakdowns=False, confirm=()):
+    with open(config_path, "r") as f:
+        config = json.load(f)
+
+    codes = codes or available_codes()
+    frames = {code: load_minute_bars(code) for code in codes}
+    stocks = {code: find_stock(config, code) for code in codes}
+    if confirm:
+        frames = with_indicators(
+            frames, {code: stock or {} for code, stock in stocks.items()}
+        )
+
+    all_trades, summaries = [], []
+    for code in codes:
+        df, stock = frames[code], stocks[code]
+        resistance, support, source = stock_levels(stock, df)
+        stock = stock or {}
+        trades, summary = backtest_stock(
+            df, resistance, support, breakdowns, confirm, stock
+        )
+
+        trades.insert(0, "Stock", code)
+        all_trades.append(trades)
+        summaries.append(
+            {
+                "Stock": code,
+                "Resistance": resistance,
+                "Support": support,
+                "Levels": source,
+                **summary,
+            }
+        )
+
+    return pd.concat(all_trades, ignore_index=True), pd.DataFrame(summaries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the breakout rule")
+    parser.add_argument("codes", nargs="*", help="stock codes (default: all)")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument(
+        "--breakdowns", action="store_true", help="also trade breakdown alerts"
+    )
+    parser.add_argument(
+        "--confirm",
+        default="",
+        help=f"comma-separated indicator confirmations: {','.join(CONFIRMATIONS)}",
+    )
+    parser.add_argument("--out", default="backtest", help="output folder")
+    args = parser.parse_args()
+
+    confirm = tuple(c for c in args.confirm.split(",") if c)
+    trades, summary = run_backtest(args.codes, args.config, args.breakdowns, confirm)
+
+    os.makedirs(args.out, exist_ok=True)
+    trades.to_csv(os.path.join(args.out, "trades.csv"), index=False)
+    summary.to_csv(os.path.join(args.out, "summary.csv"), index=False)
+
+    print(summary.to_string(index=False))
+    print(f"[✓] {len(trades)} trades saved to {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# bar_builder.py
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from schema import LIVE_BAR_DTYPE, NAT
+
+SESSION = ("09:15", "15:30")
+BAR_STORE_DIR = "bar_data"  # closed live bars, one ColumnStore per interval
+LATENESS = 2  # seconds a finished bar waits for out-of-order ticks
+DAY_NS = 24 * 60 * 60 * 10**9
+NAN = float("nan")
+
+_EMPTY = np.zeros(0, dtype=LIVE_BAR_DTYPE)
+
+
+def interval_ns(interval):
+    step = pd.Timedelta(interval).value
+    if step <= 0:
+        raise ValueError(f"bad bar interval: {interval!r}")
+    return step
+
+
+class BarBuilder:
+    """Streaming tick -> OHLCV bar aggregation for one symbol.
+
+    Bars are aligned to the session open and stay open until the newest
+    tick time is `lateness` seconds past their end, so slightly
+    out-of-order ticks still land in the right bar; anything older is
+    counted in `late` and dropped. Ticks outside the session are ignored
+    and the day's last bar ends at the session close. Volume comes from
+    differences in the cumulative day volume when the feed has it.
+    Bars use the schema's LIVE_BAR_DTYPE.
+    """
+
+    def __init__(self, interval="1min", session=SESSION, lateness=LATENESS):
+        self.interval = interval
+        self.step = interval_ns(interval)
+        self.open_offset = pd.Timedelta(f"{session[0]}:00").value
+        self.close_offset = pd.Timedelta(f"{session[1]}:00").value
+        self.lateness = int(lateness * 1e9)
+
+        # start -> [first_ts, last_ts, open, high, low, close, volume, ticks, received]
+        self.bars = {}
+        self.watermark = NAT  # newest tick time seen
+        self.closed_at = NAT  # bars ending at or before this are final
+        self.offset = None  # ReceivedAt - Timestamp of the newest tick
+        self.day = None
+        self.last_total = NAN
+
+        self.late = 0
+        self.outside = 0
+
+    def _bounds(self, ts):
+        day = ts - ts % DAY_NS
+        return day, day + self.open_offset, day + self.close_offset
+
+    def bar_end(self, start):
+        _, _, close = self._bounds(start)
+        return min(start + self.step, close)
+
+    def add(self, ts, price, total_volume=NAN, qty=NAN, received_at=0):
+        """Feed one tick; returns the bars it closed (oldest first)."""
+        if ts == NAT or price != price:
+            return _EMPTY
+
+        day, session_open, session_close = self._bounds(ts)
+        if self.day is None or day > self.day:
+            self.day = day
+            self.last_total = NAN  # cumulative volume restarts every day
+
+        volume = qty if qty == qty else 0
+        if total_volume > 0:  # 0 / NaN: the feed didn't send it
+            if self.last_total == self.last_total:
+                volume = max(total_volume - self.last_total, 0.0)
+            if not total_volume < self.last_total:
+                self.last_total = total_volume
+
+        if ts > self.watermark:
+            self.watermark = ts
+            if received_at:
+                self.offset = received_at - ts
+
+        if not session_open <= ts < session_close:
+            self.outside += 1
+            return self._close_through(self.watermark - self.lateness)
+
+        start = session_open + (ts - session_open) // self.step * self.step
+        if self.bar_end(start) <= self.closed_at:
+            self.late += 1
+            return _EMPTY
+
+        bar = self.bars.get(start)
+        if bar is None:
+            self.bars[start] = [
+                ts,
+                ts,
+                price,
+                price,
+                price,
+                price,
+                volume,
+                1,
+                received_at,
+            ]
+        else:
+            if ts < bar[0]:
+                bar[0], bar[2] = ts, price
+            if ts >= bar[1]:
+                bar[1], bar[5] = ts, price
+            bar[3] = max(bar[3], price)
+            bar[4] = min(bar[4], price)
+            bar[6] += volume
+            bar[7] += 1
+            bar[8] = max(bar[8], received_at)
+        return self._close_through(self.watermark - self.lateness)
+
+    def _close_through(self, until):
+        if until <= self.closed_at:
+            return _EMPTY
+        self.closed_at = until
+        done = sorted(start for start in self.bars if self.bar_end(start) <= until)
+        if not done:
+            return _EMPTY
+        rows = []
+        for start in done:
+            _, _, o, h, l, c, v, n, received = self.bars.pop(start)
+            rows.append((start, o, h, l, c, v, n, received))
+        return np.array(rows, dtype=LIVE_BAR_DTYPE)
+
+    def flush_idle(self, now=None):
+        """Close bars whose time has passed even though no newer tick came.
+
+        `now` is wall-clock epoch ns; it is mapped onto the feed's clock with
+        the offset seen on the latest tick.
+        """
+        if self.offset is None:
+            return _EMPTY
+        now = time.time_ns() if now is None else now
+        return self._close_through(now - self.offset - self.lateness)
+
+    def flush(self):
+        """Close every open bar (end of replay / shutdown)."""
+        if not self.bars:
+            return _EMPTY
+        return self._close_through(max(self.bar_end(start) for start in self.bars))
+
+    def stats(self):
+        return {"open": len(self.bars), "late": self.late, "outside": self.outside}
+
+
+def build_bars(ticks, interval="1min", session=SESSION, lateness=LATENESS):
+    """Bars for a batch of ticks (columns or structured array, TICK_DTYPE names)."""
+    builder = BarBuilder(interval, session, lateness)
+    parts = [
+        builder.add(ts, price, total, qty, received)
+        for ts, price, total, qty, received in zip(
+            ticks["Timestamp"],
+            ticks["Close"],
+            ticks["TotalVolume"],
+            ticks["Volume"],
+            ticks["ReceivedAt"],
+        )
+    ]
+    parts.append(builder.flush())
+    return np.concatenate(parts)
@@ -0,0 +1,145 @@
+# benchmarks/bench_dashboard.py
+#
+# Dashboard refresh cost with 5, 20 and 50 cards: the old per-rerun data
+# path (json + full CSV parse per card) versus the cached data layer, plus
+# wall time of a whole app.py run through Streamlit's AppTest. Run from the
+# repo root:
+#   python -m benchmarks.bench_dashboard [cards ...]
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+import streamlit.logger
+from streamlit.testing.v1 import AppTest
+
+import dashboard_data
+from column_store import ColumnStore, to_frame
+from indicator import INDICATOR_COLUMNS
+from schema import EXCHANGE, TICK_DTYPE
+
+ROWS = 500
+REPEAT = 5
+APP = os.path.abspath("app.py")
+COMPANIES = os.path.abspath("data.csv")
+WINDOW_DTYPE = np.dtype(TICK_DTYPE.descr + [(c, "f8") for c in INDICATOR_COLUMNS])
+
+
+def make_rows(n, seed):
+    rng = np.random.default_rng(seed)
+    rows = np.zeros(n, dtype=WINDOW_DTYPE)
+    start = pd.Timestamp("2025-08-01 09:15:00").value
+    rows["Timestamp"] = start + np.arange(n) * 1_000_000_000
+    for name in ("Open", "High", "Low", "Close"):
+        rows[name] = 2000 + np.cumsum(rng.normal(0, 0.5, n))
+    for name in INDICATOR_COLUMNS:
+        rows[name] = rng.normal(size=n)
+    rows["Exchange"] = EXCHANGE.encode("NSE")
+    return rows
+
+
+def setup(folder, cards):
+    codes = [f"BENCH{i:02d}" for i in range(cards)]
+    stock = {
+        "support": 1000,
+        "resistance": 3000,
+        "volume_threshold": 100000,
+        "bollinger": {"period": 20, "std_dev": 2.0},
+        "adx": {"period": 14, "threshold": 25},
+    }
+    with open(os.path.join(folder, "config.json"), "w") as f:
+        json.dump({"stocks": [{"stock_code": c, **stock} for c in codes]}, f)
+    shutil.copy(COMPANIES, os.path.join(folder, "data.csv"))
+
+    store = ColumnStore(os.path.join(folder, "market_data"))
+    for i, code in enumerate(codes):
+        rows = make_rows(ROWS, i)
+        store.append(code, rows)
+        # What the server used to rewrite on every batch
+        to_frame(rows).to_csv(
+            os.path.join(folder, f"latest_data_{code}.csv"), index=False
+        )
+    store.close()
+    return codes
+
+
+def old_data_path(codes):
+    with open("config.json") as f:
+        json.load(f)
+    for code in codes:
+        pd.read_csv(f"latest_data_{code}.csv").sort_values("Timestamp")
+
+
+def new_data_path(codes):
+    dashboard_data.load_config()
+    for code in codes:
+        dashboard_data.load_latest_df(code)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        fn(*args)
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def bench(cards):
+    cwd = os.getcwd()
+    folder = tempfile.mkdtemp(prefix="bench_dashboard_")
+    try:
+        codes = setup(folder, cards)
+        os.chdir(folder)
+        # Bare-mode cache warnings; AppTest resets the level on every run
+        streamlit.logger.set_log_level("error")
+        st.cache_data.clear()
+        st.cache_resource.clear()
+
+        old = timed(old_data_path, codes)
+        new_data_path(codes)  # fill the cache
+        cached = timed(new_data_path, codes)
+
+        app = AppTest.from_file(APP, default_timeout=120)
+        start = time.perf_counter()
+        app.run()
+        assert not app.exception, app.exception
+        cold = (time.perf_counter() - start) * 1000
+        warm = timed(app.run)
+
+        # One stock ticks: only its entry reloads
+        store = ColumnStore()
+        store.append(codes[0], make_rows(1, 99))
+        store.close()
+        start = time.perf_counter()
+        app.run()
+        one_changed = (time.perf_counter() - start) * 1000
+        return old, cached, cold, warm, one_changed
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def main():
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    sizes = [int(a) for a in sys.argv[1:]] or [5, 20, 50]
+
+    print(f"{ROWS} rows per stock, times in ms (mean of {REPEAT})")
+    print(
+        f"  {'cards':>5}  {'old data path':>14}  {'cached data':>12}"
+        f"  {'app cold':>9}  {'app warm':>9}  {'1 changed':>9}"
+    )
+    for cards in sizes:
+        old, cached, cold, warm, one_changed = bench(cards)
+        print(
+            f"  {cards:>5}  {old:>14.1f}  {cached:>12.1f}"
+            f"  {cold:>9.1f}  {warm:>9.1f}  {one_changed:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# benchmarks/bench_panel_indicators.py
+#
+# Per-stock add_indicators loop over each stock's own bars versus one
+# add_indicators_panel pass over the same bars stacked by bar number
+# (history.stack_bars). Run from the repo root:
+#   python -m benchmarks.bench_panel_indicators [repeats]
+
+import json
+import sys
+import time
+
+from history import available_codes, load_minute_bars, stack_bars
+from indicator import add_indicators, add_indicators_panel
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with open("config.json", "r") as f:
+        config = json.load(f)["stocks"][0]
+
+    frames = {code: load_minute_bars(code) for code in available_codes()}
+    panel = stack_bars(frames)
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for df in frames.values():
+            add_indicators(df.copy(), config)
+    per_stock = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        add_indicators_panel(panel, config)
+    batched = (time.perf_counter() - start) / repeats
+
+    bars = sum(len(df) for df in frames.values())
+    rows = len(panel["Close"])
+    print(
+        f"{len(frames)} symbols, {bars} bars (panel {rows} rows incl. padding),"
+        f" {repeats} repeats"
+    )
+    print(f"  per-stock add_indicators   {per_stock * 1000:8.1f} ms/pass")
+    print(f"  add_indicators_panel       {batched * 1000:8.1f} ms/pass")
+    print(f"  speedup                    {per_stock / batched:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+# benchmarks/bench_pipeline.py
+#
+# End-to-end throughput of the live pipeline without a Breeze session: a
+# deterministic synthetic feed drives the real feed hub (collector.py), the
+# sharded monitor workers and the incremental indicators (server.py) through
+# the shared-memory rings, and reports ticks/s, lost ticks, tick→eval latency
+# percentiles, CPU and peak RSS per role. Run from the repo root:
+#   python -m benchmarks.bench_pipeline [--symbols 20] [--ticks 2000]
+#       [--rate 0] [--workers N] [--bars 1min]
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import Manager, Process, Queue
+
+import numpy as np
+import pandas as pd
+
+import server
+from collector import start_feed_hub
+from column_store import ColumnStore
+from ring_buffer import TickRing, ring_name, start_resource_tracker
+from scheduler import ShardScheduler
+from supervisor import process_usage
+
+SESSION_START = pd.Timestamp("2025-08-01 09:15:00")
+LTT_FORMAT = "%a %b %d %H:%M:%S %Y"  # Breeze's last-traded-time format
+STALL_TIMEOUT = 10  # seconds without a stored tick before giving up
+SAMPLE_INTERVAL = 0.05
+
+# Never alert: the benchmark measures the pipeline, not Telegram
+STOCK = {
+    "support": 0,
+    "resistance": 10**9,
+    "volume_threshold": 100000,
+    "bollinger": {"period": 20, "std_dev": 2.0},
+    "macd": {"fast_period": 12, "slow_period": 26, "signal_period": 9},
+    "adx": {"period": 14, "threshold": 25},
+    "moving_averages": {"ma_fast": 9, "ma_slow": 21},
+}
+
+
+def symbols(count):
+    return [f"BENCH{i:03d}" for i in range(count)]
+
+
+class SyntheticTicks:
+    """Deterministic exchange-quote ticks shaped like Breeze's on_ticks dicts.
+
+    Each symbol gets its own seeded random walk; ticks are interleaved
+    round-robin and the exchange time advances `step` seconds per tick.
+    Dicts are built on demand, like the SDK does from websocket frames.
+    """
+
+    def __init__(self, codes, per_symbol, seed=42, step=0.25):
+        self.codes = codes
+        self.per_symbol = per_symbol
+        self.step = step
+        self.series = {}
+        for i, code in enumerate(codes):
+            rng = np.random.default_rng([seed, i])
+            last = np.round(1000 + np.cumsum(rng.normal(0, 0.5, per_symbol)), 2)
+            qty = rng.integers(1, 500, per_symbol)
+            self.series[code] = (
+                last,
+                qty,
+                np.cumsum(qty),
+                rng.integers(0, 2, per_symbol),
+            )
+
+    def __len__(self):
+        return len(self.codes) * self.per_symbol
+
+    def tick(self, code, i):
+        last, qty, total, side = self.series[code]
+        price = float(last[i])
+        ltt = SESSION_START + pd.Timedelta(seconds=int(i * self.step))
+        return {
+            "symbol": f"4.1!{code}",
+            "open": float(last[0]),
+            "last": price,
+            "high": float(last[: i + 1].max()),
+            "low": float(last[: i + 1].min()),
+            "change": round(price - float(last[0]), 2),
+            "bPrice": round(price - 0.05, 2),
+            "bQty": int(qty[i]) * 2,
+            "sPrice": round(price + 0.05, 2),
+            "sQty": int(qty[i]) * 3,
+            "ltq": int(qty[i]),
+            "avgPrice": price,
+            "quotes": "Quotes Data",
+            "ttq": int(total[i]),
+            "totalBuyQt": int(total[i]) // 2,
+            "totalSellQ": int(total[i]) // 2,
+            "ttv": "0",
+            "trend": "Up" if side[i] else "Down",
+            "lowerCktLm": round(float(last[0]) * 0.9, 2),
+            "upperCktLm": round(float(last[0]) * 1.1, 2),
+            "ltt": ltt.strftime(LTT_FORMAT),
+            "close": float(last[0]),
+            "exchange": "NSE Equity",
+            "stock_name": code,
+        }
+
+    def __iter__(self):
+        for i in range(self.per_symbol):
+            for code in self.codes:
+                yield self.tick(code, i)
+
+
+class SyntheticBreeze:
+    """Stands in for BreezeConnect inside the feed hub.
+
+    Waits until every benchmark symbol is subscribed, then calls on_ticks
+    with `batch` ticks at a time, paced to `rate` ticks/s (0: flat out).
+    """
+
+    def __init__(self, ticks, rate=0, batch=1):
+        self.ticks = ticks
+        self.rate = rate
+        self.batch = batch
+        self.subscribed = set()
+        self.on_ticks = None
+
+    def generate_session(self, **kwargs):
+        pass
+
+    def get_stock_token_value(self, stock_code, **kwargs):
+        return f"4.1!{stock_code}", f"4.2!{stock_code}"
+
+    def subscribe_feeds(self, stock_code, **kwargs):
+        self.subscribed.add(stock_code)
+
+    def unsubscribe_feeds(self, stock_code, **kwargs):
+        self.subscribed.discard(stock_code)
+
+    def ws_connect(self):
+        threading.Thread(target=self._stream, daemon=True).start()
+
+    def _stream(self):
+        while len(self.subscribed) < len(self.ticks.codes):
+            time.sleep(0.01)
+        start = time.perf_counter()
+        batch = []
+        for sent, tick in enumerate(self.ticks, 1):
+            batch.append(tick)
+            if len(batch) < self.batch:
+                continue
+            self.on_ticks(batch if self.batch > 1 else batch[0])
+            batch = []
+            if self.rate:
+                ahead = start + sent / self.rate - time.perf_counter()
+                if ahead > 0:
+                    time.sleep(ahead)
+        if batch:
+            self.on_ticks(batch)
+
+
+def run_hub(commands, codes, per_symbol, rate, batch, seed):
+    sys.stdout = open(os.devnull, "w")
+    ticks = SyntheticTicks(codes, per_symbol, seed)
+    start_feed_hub(commands, SyntheticBreeze(ticks, rate, batch))
+
+
+def run_monitor(name, commands, new_data, errors, released, out):
+    # Records the exact tick→eval latency of every evaluation
+    sys.stdout = open(os.devnull, "w")
+    latencies = []
+    evaluate = server.evaluate
+
+    def timed_evaluate(stock_code, row, *args):
+        evaluate(stock_code, row, *args)
+        latencies.append(time.time_ns() - args[-2])
+
+    server.evaluate = timed_evaluate
+    server.monitor_worker(name, commands, new_data, errors, released)
+    np.save(out, np.array(latencies, dtype=np.int64))
+
+
+def role_usage(processes):
+    # (RSS bytes, CPU seconds) summed over a role's processes
+    samples = [process_usage(p.pid) or (0, 0.0) for p in processes]
+    return sum(s[0] for s in samples), sum(s[1] for s in samples)
+
+
+def stored_ticks(store, codes):
+    day = SESSION_START.strftime("%Y-%m-%d")
+    return sum(store.count(code, day) for code in codes)
+
+
+def first_received(store, codes):
+    day = SESSION_START.strftime("%Y-%m-%d")
+    return min(
+        int(store.read(code, day, ["ReceivedAt"], 0, 1)["ReceivedAt"][0])
+        for code in codes
+        if store.count(code, day)
+    )
+
+
+def bench(args):
+    codes = symbols(args.symbols)
+    total = len(codes) * args.ticks
+    scheduler = ShardScheduler(args.workers)
+    for code in codes:
+        scheduler.add(code)
+
+    rings = {code: TickRing.create(ring_name(code)) for code in codes}
+    manager = Manager()  # wake-up Events travel over queues, as in server.py
+    errors, released = Queue(), Queue()
+    workers, hub_commands, hub = {}, Queue(), None
+    try:
+        for shard, stocks in scheduler.shards.items():
+            commands, new_data = Queue(), manager.Event()
+            for code in sorted(stocks):
+                config = {"stock_code": code, **STOCK}
+                if args.bars:
+                    config["bar_interval"] = args.bars
+                commands.put(("add", code, config, None))
+                hub_commands.put(("subscribe", code, new_data))
+            process = Process(
+                target=run_monitor,
+                args=(shard, commands, new_data, errors, released, f"{shard}.npy"),
+            )
+            process.start()
+            workers[shard] = (process, commands, new_data)
+
+        hub = Process(
+            target=run_hub,
+            args=(hub_commands, codes, args.ticks, args.rate, args.batch, args.seed),
+        )
+        hub.start()
+
+        store = ColumnStore()
+        processes = {"hub": [hub], "monitors": [w[0] for w in workers.values()]}
+        peak = dict.fromkeys(processes, 0)
+        baseline = None  # CPU seconds per role when the first tick arrived
+        stored, progress_at = 0, time.time()
+        while time.time() - progress_at < STALL_TIMEOUT:
+            time.sleep(SAMPLE_INTERVAL)
+            usage = {role: role_usage(procs) for role, procs in processes.items()}
+            for role, (rss, _) in usage.items():
+                peak[role] = max(peak[role], rss)
+            received = sum(ring.count for ring in rings.values())
+            if baseline is None and received:
+                baseline = {role: cpu for role, (_, cpu) in usage.items()}
+
+            now = stored_ticks(store, codes)
+            if now > stored:
+                stored, progress_at = now, time.time()
+            if stored == total:
+                break
+            # Everything delivered but monitors fell behind: the rest is lost
+            if received == total and time.time() - progress_at > 1:
+                break
+        finished = time.time_ns()
+
+        cpu = {
+            role: role_usage(procs)[1] - (baseline or {}).get(role, 0)
+            for role, procs in processes.items()
+        }
+        elapsed = (finished - first_received(store, codes)) / 1e9 if stored else 0.0
+    finally:
+        for process, commands, new_data in workers.values():
+            commands.put(None)
+            new_data.set()
+        for process, _, _ in workers.values():
+            process.join(10)
+        if hub is not None:
+            hub.terminate()
+            hub.join()
+        for ring in rings.values():
+            ring.close()
+        manager.shutdown()
+
+    latencies = np.concatenate([np.load(f"{shard}.npy") for shard in workers]) / 1e6
+    failures = []
+    while not errors.empty():
+        failures.append(errors.get())
+    return {
+        "ticks": total,
+        "stored": stored,
+        "elapsed": elapsed,
+        "latency_ms": latencies,
+        "cpu": cpu,
+        "peak_rss": peak,
+        "workers": len(workers),
+        "errors": failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark")
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--ticks", type=int, default=2000, help="ticks per symbol")
+    parser.add_argument(
+        "--rate", type=float, default=0, help="total ticks/s (0: as fast as possible)"
+    )
+    parser.add_argument("--batch", type=int, default=1, help="ticks per on_ticks call")
+    parser.add_argument("--workers", type=int, default=server.MONITOR_WORKERS)
+    parser.add_argument("--bars", help="bar_interval, e.g. 1min (default: per tick)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start_resource_tracker()
+    cwd = os.getcwd()
+    folder = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        os.chdir(folder)  # market_data/, bar_data/ and latency files go here
+        result = bench(args)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(folder, ignore_errors=True)
+
+    elapsed = result["elapsed"] or float("nan")
+    lost = result["ticks"] - result["stored"]
+    rate = f"{args.rate:,.0f} ticks/s" if args.rate else "unlimited"
+    mode = f"{args.bars} bars" if args.bars else "per-tick indicators"
+    print(
+        f"{args.symbols} symbols x {args.ticks} ticks, rate {rate},"
+        f" {result['workers']} monitor workers, {mode}"
+    )
+    print(
+        f"  {'throughput':<12} {result['stored'] / elapsed:>10,.0f} ticks/s"
+        f"  ({result['stored']} stored in {elapsed:.2f}s, {lost} lost)"
+    )
+    latency = result["latency_ms"]
+    if len(latency):
+        p50, p90, p99 = np.percentile(latency, [50, 90, 99])
+        print(
+            f"  {'tick→eval':<12} p50={p50:.2f}ms p90={p90:.2f}ms p99={p99:.2f}ms"
+            f" max={latency.max():.2f}ms (n={len(latency)})"
+        )
+    cpu, rss = result["cpu"], result["peak_rss"]
+    print(
+        f"  {'cpu':<12} hub {cpu['hub'] / elapsed * 100:.0f}%"
+        f"  monitors {cpu['monitors'] / elapsed * 100:.0f}%"
+        f"  ({cpu['hub'] + cpu['monitors']:.2f}s total)"
+    )
+    print(
+        f"  {'peak rss':<12} hub {rss['hub'] / 2**20:.0f}MB"
+        f"  monitors {rss['monitors'] / 2**20:.0f}MB"
+    )
+    for stock_code, error_type, message in result["errors"][:5]:
+        print(f"  [!] {stock_code}: {error_type}: {message}")
+
+
+if __name__ == "__main__":
+    main()
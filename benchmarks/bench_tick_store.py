@@ -0,0 +1,72 @@
+# benchmarks/bench_tick_store.py
+#
+# Ticks/second for the old collector window (pd.concat + tail(500) per tick)
+# versus TickStore appends. Run from the repo root:
+#   python -m benchmarks.bench_tick_store [num_ticks]
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from schema import EXCHANGE, TICK_DTYPE
+from tick_store import TickStore
+
+WINDOW = 500
+
+
+def make_rows(n):
+    rng = np.random.default_rng(42)
+    start = pd.Timestamp("2025-08-01 09:15:00").value
+    price = 2000 + np.cumsum(rng.normal(0, 0.5, n))
+    rows = []
+    for i in range(n):
+        row = {name: float(price[i]) for name in TICK_DTYPE.names}
+        row["Timestamp"] = start + i * 1_000_000_000
+        row["Volume"] = int(rng.integers(1, 500))
+        row["Exchange"] = EXCHANGE.encode("NSE")
+        row["Trend"] = 0
+        rows.append(row)
+    return rows
+
+
+def bench_concat(rows):
+    df = pd.DataFrame()
+    start = time.perf_counter()
+    for row in rows:
+        df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+        df = df.tail(WINDOW)
+    return time.perf_counter() - start
+
+
+def bench_tick_store(rows, frame_every=None):
+    store = TickStore(TICK_DTYPE, capacity=WINDOW)
+    start = time.perf_counter()
+    for i, row in enumerate(rows):
+        store.append(row)
+        if frame_every and i % frame_every == 0:
+            store.to_frame()
+    return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rows = make_rows(n)
+
+    results = [
+        ("pd.concat + tail(500)", bench_concat(rows)),
+        ("TickStore.append", bench_tick_store(rows)),
+        ("TickStore.append + to_frame/100", bench_tick_store(rows, frame_every=100)),
+    ]
+
+    baseline = results[0][1]
+    print(f"{n} ticks, window {WINDOW}")
+    for label, elapsed in results:
+        print(
+            f"  {label:<34} {n / elapsed:>12,.0f} ticks/s  ({baseline / elapsed:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,76 +1,123 @@
 import os
-import time
-import pandas as pd
+import queue
+import threading
 from dotenv import load_dotenv
 from breeze_connect import BreezeConnect
 
+import metrics
+from ring_buffer import TickRing, ring_name
+from schema import parse_tick
+
 load_dotenv()
 
 API_KEY = os.getenv("BREEZE_API_KEY")
 API_SECRET = os.getenv("BREEZE_API_SECRET")
 SESSION_TOKEN = os.getenv("BREEZE_SESSION_TOKEN")
 
+FEED_PARAMS = {
+    "exchange_code": "NSE",
+    "product_type": "cash",
+    "get_market_depth": False,
+    "get_exchange_quotes": True,
+}
+
+TICKS_RECEIVED = metrics.counter(
+    "ticks_received_total", "Ticks written to a stock's ring", "symbol"
+)
+TICK_PARSE = metrics.histogram("tick_parse_seconds", "Breeze tick -> schema row")
+RING_WRITE = metrics.histogram("ring_write_seconds", "Row copy into shared memory")
+
 
-def start_collector(shared_data, stock_code="HDFBAN"):
-    df = pd.DataFrame()
+def start_feed_hub(commands, breeze=None, namespace=""):
+    """Single Breeze session/websocket for every watched stock.
 
-    breeze = BreezeConnect(api_key=API_KEY)
+    The server sends ("subscribe", code, new_data) / ("unsubscribe", code, None)
+    on the `commands` queue as config.json changes; ticks are routed by stock
+    code into that stock's shared-memory TickRing and `new_data` (an Event)
+    is set to wake the monitor worker serving it. Subscribing again only
+    swaps the Event, when a stock moves between workers. `breeze` replaces
+    the live session with a stand-in (replay_feed, benchmarks); `namespace`
+    is the ring namespace the server created the rings in.
+    """
+    metrics.start("feed_hub")
+    if breeze is None:
+        breeze = BreezeConnect(api_key=API_KEY)
     breeze.generate_session(api_secret=API_SECRET, session_token=SESSION_TOKEN)
 
-    print(f"🟢 Collector started for {stock_code}")
+    rings = {}  # stock_code -> TickRing
+    events = {}  # stock_code -> Event set after new ticks are written
+    tokens = {}  # feed token (tick["symbol"]) -> stock_code
+    lock = threading.Lock()
+
+    print("🟢 Feed hub started")
 
     def on_ticks(ticks):
-        nonlocal df
-        tick = ticks[0] if isinstance(ticks, list) else ticks
+        updated = set()
+        for tick in ticks if isinstance(ticks, list) else [ticks]:
+            code = tick.get("stock_code") or tokens.get(tick.get("symbol"))
+            try:
+                with lock:
+                    ring = rings.get(code)
+                    if ring is not None:
+                        with TICK_PARSE.time():
+                            row = parse_tick(tick)
+                        with RING_WRITE.time():
+                            ring.append(row)
+                        TICKS_RECEIVED.inc(1, code)
+                        updated.add(code)
+            except Exception as e:
+                print(f"[{code}] Tick processing error: {e}")
+
+        # One wake-up per stock per batch, outside the lock (it's an IPC call)
+        for code in updated:
+            event = events.get(code)
+            if event is not None:
+                event.set()
 
+    def subscribe(code, new_data):
+        if code in rings:
+            # Already streaming: the stock moved to another monitor worker
+            with lock:
+                events[code] = new_data
+            return
+        with lock:
+            rings[code] = TickRing.attach(ring_name(code, namespace))
+            events[code] = new_data
+        try:
+            token, _ = breeze.get_stock_token_value(stock_code=code, **FEED_PARAMS)
+            tokens[token] = code
+        except Exception as e:
+            print(f"[{code}] Token lookup error, relying on tick stock_code: {e}")
         try:
-            timestamp = pd.to_datetime(tick.get("ltt"))
-
-            new_row = {
-                "Timestamp": timestamp,
-                "Open": tick.get("open"),
-                "High": tick.get("high"),
-                "Low": tick.get("low"),
-                "Close": tick.get("last"),
-                "PrevClose": tick.get("close"),  # Previous close
-                "Change": tick.get("change"),
-                "Volume": tick.get("ltq"),  # Last traded quantity
-                "TotalVolume": tick.get("ttq"),  # Total traded quantity
-                "BuyQty": tick.get("bQty"),
-                "SellQty": tick.get("sQty"),
-                "BuyPrice": tick.get("bPrice"),
-                "SellPrice": tick.get("sPrice"),
-                "TotalBuyQty": tick.get("totalBuyQt"),
-                "TotalSellQty": tick.get("totalSellQ"),
-                "AvgPrice": tick.get("avgPrice"),
-                "UpperCircuit": tick.get("upperCktLm"),
-                "LowerCircuit": tick.get("lowerCktLm"),
-                "Exchange": tick.get("exchange"),
-                "StockName": tick.get("stock_name"),
-                "Trend": tick.get("trend") or "",
-            }
-
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            df = df.tail(500)  # Maintain rolling window
-
-            shared_data[stock_code] = df.to_json()
+            breeze.subscribe_feeds(stock_code=code, **FEED_PARAMS)
+            print(f"[📡 SUBSCRIBED] {code}")
+        except Exception as e:
+            print(f"[{code}] Subscription error: {e}")
 
+    def unsubscribe(code):
+        try:
+            breeze.unsubscribe_feeds(stock_code=code, **FEED_PARAMS)
+            print(f"[🔕 UNSUBSCRIBED] {code}")
         except Exception as e:
-            print(f"[{stock_code}] Tick processing error: {e}")
+            print(f"[{code}] Unsubscribe error: {e}")
+        with lock:
+            ring = rings.pop(code, None)
+            events.pop(code, None)
+            for token in [t for t, c in tokens.items() if c == code]:
+                del tokens[token]
+        if ring is not None:
+            ring.close()
 
     breeze.on_ticks = on_ticks
     breeze.ws_connect()
 
-    try:
-        breeze.subscribe_feeds(
-            exchange_code="NSE",
-            stock_code=stock_code,
-            product_type="cash",
-            get_market_depth=False,
-            get_exchange_quotes=True,
-        )
-    except Exception as e:
-        print(f"[{stock_code}] Subscription error: {e}")
-
     while True:
-        time.sleep(1)
+        try:
+            action, code, new_data = commands.get(timeout=1)
+        except queue.Empty:
+            continue
+
+        if action == "subscribe":
+            subscribe(code, new_data)
+        elif action == "unsubscribe":
+            unsubscribe(code)
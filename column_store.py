@@ -0,0 +1,220 @@
+# column_store.py
+
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from schema import NAT, to_frame
+
+STORE_DIR = "market_data"
+SCHEMA_FILE = "_schema.json"
+NS_PER_DAY = 86_400 * 10**9
+
+
+def _day(ns):
+    return pd.Timestamp(int(ns) // NS_PER_DAY * NS_PER_DAY).strftime("%Y-%m-%d")
+
+
+def _as_columns(rows):
+    # Structured arrays (ring/window rows) and dicts of arrays are both accepted
+    if isinstance(rows, np.ndarray):
+        return {name: rows[name] for name in rows.dtype.names}
+    return {name: np.asarray(values) for name, values in rows.items()}
+
+
+class ColumnStore:
+    """Append-only columnar store partitioned by symbol and trading day.
+
+    Each partition is a folder holding one raw binary file per column and a
+    small schema file, e.g. market_data/TCS/2025-07-10/Close.bin. Appends
+    only write the new values; reads seek straight to the rows they need.
+    A partition's row count is its shortest column, so readers never see a
+    half-written append.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self._writers = {}  # symbol -> (day, schema, {column: file})
+
+    def symbols(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name
+            for name in os.listdir(self.root)
+            if os.path.isdir(os.path.join(self.root, name))
+        )
+
+    def days(self, symbol):
+        folder = os.path.join(self.root, symbol.upper())
+        if not os.path.isdir(folder):
+            return []
+        return sorted(
+            name
+            for name in os.listdir(folder)
+            if os.path.isfile(os.path.join(folder, name, SCHEMA_FILE))
+        )
+
+    def partition_path(self, symbol, day):
+        return os.path.join(self.root, symbol.upper(), day)
+
+    def schema(self, symbol, day):
+        with open(os.path.join(self.partition_path(symbol, day), SCHEMA_FILE)) as f:
+            return {name: np.dtype(code) for name, code in json.load(f).items()}
+
+    # --- writing -----------------------------------------------------------
+
+    def append(self, symbol, rows):
+        """Append rows (structured array or dict of equal-length arrays)."""
+        columns = _as_columns(rows)
+        if not columns:
+            return 0
+        size = len(next(iter(columns.values())))
+        if size == 0:
+            return 0
+
+        # Partition by exchange timestamp; unparsable ones fall back to
+        # arrival time so they still land in today's partition.
+        stamps = columns.get("Timestamp")
+        if stamps is None:
+            stamps = np.full(size, time.time_ns(), dtype=np.int64)
+        else:
+            stamps = np.asarray(stamps).astype("datetime64[ns]").view(np.int64)
+            missing = stamps == NAT
+            if missing.any():
+                fallback = columns.get("ReceivedAt", np.full(size, time.time_ns()))
+                stamps = np.where(missing, fallback, stamps)
+
+        days = stamps // NS_PER_DAY
+        bounds = np.flatnonzero(np.diff(days)) + 1
+        for start, stop in zip(np.r_[0, bounds], np.r_[bounds, size]):
+            part = {name: values[start:stop] for name, values in columns.items()}
+            self._write(symbol.upper(), _day(stamps[start]), part)
+        return size
+
+    def _open(self, symbol, day, columns):
+        writer = self._writers.get(symbol)
+        if writer and writer[0] == day:
+            return writer
+        self._close_writer(symbol)
+
+        folder = self.partition_path(symbol, day)
+        schema_path = os.path.join(folder, SCHEMA_FILE)
+        if os.path.exists(schema_path):
+            schema = self.schema(symbol, day)
+        else:
+            os.makedirs(folder, exist_ok=True)
+            schema = {name: values.dtype for name, values in columns.items()}
+            # Readers in other processes must never see a half-written schema
+            tmp = f"{schema_path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({name: dt.str for name, dt in schema.items()}, f)
+            os.replace(tmp, schema_path)
+
+        files = {
+            name: open(os.path.join(folder, f"{name}.bin"), "ab") for name in schema
+        }
+        self._writers[symbol] = (day, schema, files)
+        return self._writers[symbol]
+
+    def _write(self, symbol, day, columns):
+        _, schema, files = self._open(symbol, day, columns)
+        if set(columns) != set(schema):
+            raise ValueError(
+                f"{symbol} {day}: columns {sorted(columns)} don't match stored schema"
+            )
+        for name, dtype in schema.items():
+            files[name].write(
+                np.ascontiguousarray(columns[name], dtype=dtype).tobytes()
+            )
+        for f in files.values():
+            f.flush()
+
+    def _close_writer(self, symbol):
+        writer = self._writers.pop(symbol, None)
+        if writer:
+            for f in writer[2].values():
+                f.close()
+
+    def release(self, symbol):
+        """Close one symbol's open files, e.g. before another process appends to it."""
+        self._close_writer(symbol.upper())
+
+    def remove(self, symbol, day):
+        """Drop one partition, e.g. before rewriting a re-downloaded day."""
+        symbol = symbol.upper()
+        writer = self._writers.get(symbol)
+        if writer and writer[0] == day:
+            self._close_writer(symbol)
+        shutil.rmtree(self.partition_path(symbol, day), ignore_errors=True)
+
+    def close(self):
+        for symbol in list(self._writers):
+            self._close_writer(symbol)
+
+    # --- reading -----------------------------------------------------------
+
+    def count(self, symbol, day):
+        folder = self.partition_path(symbol, day)
+        try:
+            schema = self.schema(symbol, day)
+        except FileNotFoundError:
+            return 0
+        sizes = []
+        for name, dtype in schema.items():
+            path = os.path.join(folder, f"{name}.bin")
+            sizes.append(
+                os.path.getsize(path) // dtype.itemsize if os.path.exists(path) else 0
+            )
+        return min(sizes, default=0)
+
+    def read(self, symbol, day, columns=None, start=0, stop=None):
+        """Rows [start:stop) of one partition as a dict of arrays."""
+        schema = self.schema(symbol, day)
+        names = list(schema) if columns is None else list(columns)
+        total = self.count(symbol, day)
+        start, stop, _ = slice(start, stop).indices(total)
+        n = max(stop - start, 0)
+
+        folder = self.partition_path(symbol, day)
+        out = {}
+        for name in names:
+            dtype = schema[name]
+            with open(os.path.join(folder, f"{name}.bin"), "rb") as f:
+                f.seek(start * dtype.itemsize)
+                out[name] = np.fromfile(f, dtype=dtype, count=n)
+        return out
+
+    def tail(self, symbol, n, columns=None):
+        """Newest n rows across the latest partitions, oldest first."""
+        if n <= 0:
+            return {}
+        parts = []
+        remaining = n
+        for day in reversed(self.days(symbol)):
+            rows = self.read(symbol, day, columns, start=-remaining)
+            size = len(next(iter(rows.values()), []))
+            if size:
+                parts.append(rows)
+                remaining -= size
+            if remaining <= 0:
+                break
+        if not parts:
+            return {}
+        parts.reverse()
+        return {name: np.concatenate([p[name] for p in parts]) for name in parts[0]}
+
+    def version(self, symbol):
+        """Cheap change marker: (latest day, rows in it)."""
+        days = self.days(symbol)
+        if not days:
+            return None
+        return days[-1], self.count(symbol, days[-1])
+
+    def tail_frame(self, symbol, n, columns=None):
+        rows = self.tail(symbol, n, columns)
+        return to_frame(rows) if rows else None
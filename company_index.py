@@ -0,0 +1,199 @@
+# company_index.py
+
+import bisect
+import hashlib
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+DATA_CSV_PATH = "data.csv"
+INDEX_PATH = "company_index.npz"
+REQUIRED_COLUMNS = ["ScripName", "CompanyName", "ShortName"]
+
+# Term kinds, best match first
+SHORT_NAME, SCRIP_NAME, COMPANY_NAME, COMPANY_WORD = range(4)
+
+_WORD = re.compile(r"[0-9a-z]+")
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _pack(strings):
+    # One utf-8 blob plus end offsets: far smaller than fixed-width arrays
+    encoded = [s.encode("utf-8") for s in strings]
+    ends = np.cumsum([len(b) for b in encoded], dtype=np.int64)
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), ends
+
+
+def _unpack(blob, ends):
+    data = blob.tobytes()
+    starts = np.r_[0, ends[:-1]]
+    return [data[a:b].decode("utf-8") for a, b in zip(starts.tolist(), ends.tolist())]
+
+
+class CompanyIndex:
+    """Prefix and fuzzy search over the exchange scrip list in data.csv.
+
+    Every ShortName, ScripName, CompanyName and company-name word becomes a
+    lowercase term in one sorted list, so a prefix lookup is a bisect.
+    Queries with too few prefix hits fall back to a subsequence match
+    ("hdfcbk" -> "HDFC BANK"). The index is saved next to the CSV and
+    rebuilt only when the CSV's hash changes.
+    """
+
+    def __init__(self, company, scrip, short, terms, term_rows, term_kinds, source_hash=""):
+        self.company = company
+        self.scrip = scrip
+        self.short = short
+        self.terms = terms
+        self.term_rows = term_rows
+        self.term_kinds = term_kinds
+        self.source_hash = source_hash
+        self._haystack = None
+
+    def __len__(self):
+        return len(self.short)
+
+    @classmethod
+    def build(cls, csv_path=DATA_CSV_PATH, source_hash=None):
+        df = pd.read_csv(csv_path, usecols=lambda c: c in REQUIRED_COLUMNS, dtype=str)
+        missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"{csv_path} is missing required columns: {missing}")
+        df = df[REQUIRED_COLUMNS].dropna().drop_duplicates()
+
+        company = df["CompanyName"].tolist()
+        scrip = df["ScripName"].tolist()
+        short = df["ShortName"].tolist()
+
+        entries = set()
+        for row, (name, scrip_name, short_name) in enumerate(zip(company, scrip, short)):
+            entries.add((short_name.lower(), SHORT_NAME, row))
+            entries.add((scrip_name.lower(), SCRIP_NAME, row))
+            entries.add((name.lower(), COMPANY_NAME, row))
+            for word in _WORD.findall(name.lower()):
+                entries.add((word, COMPANY_WORD, row))
+        entries = sorted(entries)
+
+        return cls(
+            company,
+            scrip,
+            short,
+            [term for term, _, _ in entries],
+            np.array([row for _, _, row in entries], dtype=np.int32),
+            np.array([kind for _, kind, _ in entries], dtype=np.int8),
+            source_hash or file_hash(csv_path),
+        )
+
+    def save(self, path=INDEX_PATH):
+        arrays = {"term_rows": self.term_rows, "term_kinds": self.term_kinds}
+        for name in ("company", "scrip", "short", "terms"):
+            arrays[f"{name}_blob"], arrays[f"{name}_ends"] = _pack(getattr(self, name))
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, source_hash=np.array(self.source_hash), **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        with np.load(path, allow_pickle=False) as data:
+            text = {
+                name: _unpack(data[f"{name}_blob"], data[f"{name}_ends"])
+                for name in ("company", "scrip", "short", "terms")
+            }
+            return cls(
+                term_rows=data["term_rows"],
+                term_kinds=data["term_kinds"],
+                source_hash=str(data["source_hash"]),
+                **text,
+            )
+
+    @classmethod
+    def open(cls, csv_path=DATA_CSV_PATH, index_path=INDEX_PATH):
+        """Load the saved index, rebuilding it if data.csv changed."""
+        source_hash = file_hash(csv_path)
+        try:
+            index = cls.load(index_path)
+            if index.source_hash == source_hash:
+                return index
+        except (OSError, KeyError, ValueError):
+            pass
+        index = cls.build(csv_path, source_hash)
+        try:
+            index.save(index_path)
+        except OSError as e:
+            print(f"[!] Could not save company index: {e}")
+        return index
+
+    def label(self, row):
+        return f"{self.company[row]} ({self.scrip[row]})"
+
+    def search(self, query, limit=20):
+        """Top matches as (label, ShortName) pairs, best first."""
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        lo = bisect.bisect_left(self.terms, query)
+        hi = bisect.bisect_left(self.terms, query + "\uffff", lo)
+
+        # Rank: term kind, then exact before prefix, then shorter terms
+        best = {}
+        for i in range(lo, hi):
+            term = self.terms[i]
+            key = (int(self.term_kinds[i]), term != query, len(term))
+            row = int(self.term_rows[i])
+            if row not in best or key < best[row]:
+                best[row] = key
+
+        # "tata mot": every word must start a word of the company name
+        words = query.split()
+        if len(words) > 1:
+            matched = None
+            for word in words:
+                rows = set(self._prefix_rows(word, COMPANY_WORD))
+                matched = rows if matched is None else matched & rows
+            for row in matched:
+                best.setdefault(row, (COMPANY_WORD, True, len(self.company[row])))
+
+        rows = sorted(best, key=lambda r: (best[r], self.company[r]))[:limit]
+
+        if len(rows) < limit:
+            rows += self._fuzzy(query, limit - len(rows), exclude=set(rows))
+        return [(self.label(r), self.short[r]) for r in rows]
+
+    def _prefix_rows(self, prefix, kind):
+        lo = bisect.bisect_left(self.terms, prefix)
+        hi = bisect.bisect_left(self.terms, prefix + "\uffff", lo)
+        kinds = self.term_kinds[lo:hi]
+        return self.term_rows[lo:hi][kinds == kind].tolist()
+
+    def _fuzzy(self, query, limit, exclude):
+        if self._haystack is None:
+            self._haystack = [
+                f"{s} {p} {c}".lower()
+                for s, p, c in zip(self.short, self.scrip, self.company)
+            ]
+        # Characters in order with anything between; tighter spans rank first.
+        # "a[^b]*b" instead of "a.*?b" avoids backtracking on long names.
+        chars = [ch for ch in query if not ch.isspace()]
+        pattern = re.compile(
+            re.escape(chars[0])
+            + "".join(f"[^{re.escape(ch)}]*{re.escape(ch)}" for ch in chars[1:])
+        )
+        scored = []
+        for row, text in enumerate(self._haystack):
+            if row in exclude:
+                continue
+            match = pattern.search(text)
+            if match:
+                scored.append((match.end() - match.start(), match.start(), row))
+        scored.sort()
+        return [row for _, _, row in scored[:limit]]
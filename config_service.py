@@ -0,0 +1,55 @@
+# config_service.py
+
+import json
+import os
+
+
+class ConfigWatcher:
+    """Re-parses config.json only when its mtime/size change.
+
+    poll() is a single stat() call when nothing changed. After an edit it
+    returns which stock codes were added, updated or removed so callers can
+    push just those entries to the affected monitors.
+    """
+
+    def __init__(self, path="config.json"):
+        self.path = path
+        self.signature = None
+        self.stocks = {}  # stock_code -> stock config entry
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def poll(self):
+        signature = self._stat_signature()
+        if signature is None or signature == self.signature:
+            return None
+
+        try:
+            with open(self.path, "r") as f:
+                config = json.load(f)
+        except Exception as e:
+            # Most likely caught mid-write by the dashboard; keep the old index
+            # and leave the signature unset so the next poll retries.
+            print(f"[Config Error] Failed to read {self.path}: {e}")
+            return None
+
+        self.signature = signature
+        stocks = {s["stock_code"]: s for s in config.get("stocks", [])}
+
+        added = [code for code in stocks if code not in self.stocks]
+        removed = [code for code in self.stocks if code not in stocks]
+        updated = [
+            code
+            for code in stocks
+            if code in self.stocks and stocks[code] != self.stocks[code]
+        ]
+        self.stocks = stocks
+        return added, updated, removed
+
+    def get(self, stock_code):
+        return self.stocks.get(stock_code)
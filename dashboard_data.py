@@ -0,0 +1,81 @@
+# dashboard_data.py
+
+import json
+import os
+
+import pandas as pd
+import streamlit as st
+
+from column_store import ColumnStore
+from schema import normalize_frame
+
+CONFIG_FILE = "config.json"
+DASHBOARD_ROWS = 500  # same depth the monitor keeps in memory
+
+
+def file_version(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def csv_path(stock_code):
+    return f"latest_data_{stock_code}.csv"
+
+
+@st.cache_resource
+def get_store():
+    return ColumnStore()
+
+
+def data_version(stock_code):
+    # Store position (latest day, rows) or, for CSV-only stocks, the file's mtime
+    return get_store().version(stock_code) or file_version(csv_path(stock_code))
+
+
+@st.cache_data(max_entries=4)
+def _read_config(version):
+    try:
+        with open(CONFIG_FILE, "r") as f:
+            return json.load(f)
+    except:
+        return {"stocks": []}
+
+
+def load_config():
+    # Re-parsed only when config.json's mtime/size changes
+    return _read_config(file_version(CONFIG_FILE))
+
+
+@st.cache_data(max_entries=256)
+def _read_latest_df(stock_code, version):
+    if version is None:
+        return None
+    try:
+        # Tail of the monitor's column store: reads only the newest rows
+        df = get_store().tail_frame(stock_code, DASHBOARD_ROWS)
+        if df is not None:
+            return df
+
+        # Fall back to a manually exported CSV
+        df = pd.read_csv(csv_path(stock_code))
+        if len(df) == 0:
+            return None
+
+        # Ensure a timestamp column exists before sorting
+        if "Timestamp" not in df.columns and "datetime" not in df.columns:
+            return None
+
+        # Schema names/dtypes for lowercase CSVs (like TCS); extra columns kept
+        return normalize_frame(df, extra=True).sort_values("Timestamp")
+
+    except Exception as e:
+        print(f"[!] Error loading {stock_code}: {e}")
+        return None
+
+
+def load_latest_df(stock_code):
+    # Cache key includes the data version, so only changed stocks reload
+    return _read_latest_df(stock_code, data_version(stock_code))
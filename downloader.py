@@ -0,0 +1,294 @@
+# downloader.py
+
+import argparse
+import json
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from column_store import ColumnStore
+from ratelimit import TokenBucket
+from schema import HISTORY_BAR_DTYPE, normalize_frame, to_records
+
+load_dotenv()
+
+HISTORY_STORE_DIR = "history_store"
+WORKERS = 4
+REQUESTS_PER_MINUTE = 90  # Breeze allows 100 calls/minute per session
+MAX_RETRIES = 4
+RETRY_BACKOFF = 1.0  # seconds, doubled after every failed attempt
+SESSION_OPEN = "09:15:00"
+SESSION_CLOSE = "15:30:00"
+
+# Trading days per request, so a chunk stays under Breeze's 1000-row cap
+CHUNK_DAYS = {"1minute": 2, "5minute": 13, "30minute": 75, "1day": 1000}
+
+CASH_REQUEST = {"exchange_code": "NSE", "product_type": "cash"}
+
+
+def to_bars(records):
+    df = normalize_frame(pd.DataFrame(records), HISTORY_BAR_DTYPE)
+    df = df.drop_duplicates("Timestamp", keep="last").sort_values("Timestamp")
+    return to_records(df, HISTORY_BAR_DTYPE)
+
+
+class BarDownloader:
+    """Chunked, resumable Breeze historical-data download into a ColumnStore.
+
+    Each (symbol, chunk of trading days) is one API call. Calls run on a
+    bounded thread pool behind a shared token bucket and are retried with
+    backoff. Every finished past day is cached as an .npy file (empty for
+    holidays), so a rerun only requests the days it doesn't have yet.
+    """
+
+    def __init__(
+        self,
+        client,
+        interval="1minute",
+        request=None,
+        root=HISTORY_STORE_DIR,
+        workers=WORKERS,
+        limiter=None,
+        retries=MAX_RETRIES,
+    ):
+        self.client = client
+        self.interval = interval
+        self.request = request or CASH_REQUEST
+        self.workers = workers
+        self.limiter = limiter or TokenBucket.per_minute(REQUESTS_PER_MINUTE, WORKERS)
+        self.retries = retries
+
+        tag = "_".join(
+            str(self.request[key]).replace("-", "")[:10]
+            for key in ("exchange_code", "product_type", "expiry_date")
+            if self.request.get(key)
+        )
+        self.store = ColumnStore(os.path.join(root, tag, interval))
+        self.cache_dir = os.path.join(root, "_chunks", tag, interval)
+
+    def chunks(self, days):
+        """Group trading days into requests of consecutive days, CHUNK_DAYS at most."""
+        size = CHUNK_DAYS.get(self.interval, 1)
+        chunks, run = [], []
+        for day in days:
+            gap = run and pd.Timestamp(day) - pd.Timestamp(run[-1]) > pd.Timedelta(
+                days=4
+            )
+            if len(run) == size or gap:
+                chunks.append(run)
+                run = []
+            run.append(day)
+        if run:
+            chunks.append(run)
+        return [(run[0], run[-1]) for run in chunks]
+
+    def cache_path(self, symbol, day):
+        return os.path.join(self.cache_dir, symbol.upper(), f"{day}.npy")
+
+    def fetch(self, symbol, chunk):
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+            self.limiter.acquire()
+            try:
+                data = self.client.get_historical_data(
+                    interval=self.interval,
+                    from_date=f"{chunk[0]}T{SESSION_OPEN}.000Z",
+                    to_date=f"{chunk[1]}T{SESSION_CLOSE}.000Z",
+                    stock_code=symbol,
+                    **self.request,
+                )
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                continue
+
+            records = (data or {}).get("Success")
+            if isinstance(records, list):
+                return (
+                    to_bars(records)
+                    if records
+                    else np.zeros(0, dtype=HISTORY_BAR_DTYPE)
+                )
+            error = (data or {}).get("Error") or "unexpected response"
+            if "no data" in str(error).lower():
+                # Holidays / not yet listed: a valid, empty chunk
+                return np.zeros(0, dtype=HISTORY_BAR_DTYPE)
+        raise RuntimeError(f"{symbol} {chunk[0]}..{chunk[1]}: {error}")
+
+    def save_day(self, symbol, day, bars):
+        path = self.cache_path(symbol, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp.npy"
+        np.save(tmp, bars)
+        os.replace(tmp, path)
+
+    def write_day(self, symbol, day, bars):
+        self.store.remove(symbol, day)  # rewrite the day, never duplicate it
+        if len(bars):
+            self.store.append(symbol, bars)
+        return len(bars)
+
+    def run(self, symbols, start, end):
+        days = [d.strftime("%Y-%m-%d") for d in pd.bdate_range(start, end)]
+        today = pd.Timestamp.now().strftime("%Y-%m-%d")
+        summary = {"days": 0, "cached": 0, "fetched": 0, "failed": 0, "rows": 0}
+        jobs = []
+
+        for symbol in symbols:
+            missing = []
+            for day in days:
+                summary["days"] += 1
+                path = self.cache_path(symbol, day)
+                if not os.path.exists(path):
+                    missing.append(day)
+                    continue
+                summary["cached"] += 1
+                if not self.store.count(symbol, day):
+                    summary["rows"] += self.write_day(symbol, day, np.load(path))
+            jobs += [(symbol, chunk) for chunk in self.chunks(missing)]
+
+        print(
+            f"[*] {len(symbols)} symbols x {len(days)} days: "
+            f"{summary['cached']} cached, {len(jobs)} requests to make"
+        )
+
+        # Workers only call the API; the store and cache are written from this thread
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(self.fetch, symbol, chunk): (symbol, chunk)
+                for symbol, chunk in jobs
+            }
+            for future in as_completed(futures):
+                symbol, chunk = futures[future]
+                try:
+                    bars = future.result()
+                except Exception as e:
+                    summary["failed"] += 1
+                    print(f"[!] {e}")
+                    continue
+
+                stamps = (
+                    pd.to_datetime(bars["Timestamp"]).strftime("%Y-%m-%d").to_numpy()
+                )
+                for day in (d for d in days if chunk[0] <= d <= chunk[1]):
+                    day_bars = bars[stamps == day]
+                    summary["fetched"] += 1
+                    summary["rows"] += self.write_day(symbol, day, day_bars)
+                    # Only past days are final; today's bars may still grow
+                    if day < today:
+                        self.save_day(symbol, day, day_bars)
+                print(f"[✓] {symbol} {chunk[0]}..{chunk[1]}: {len(bars)} bars")
+
+        self.store.close()
+        return summary
+
+
+class FakeBreezeClient:
+    """Offline stand-in for BreezeConnect.get_historical_data.
+
+    Returns deterministic random-walk bars per symbol for the requested
+    range; every `fail_every`-th call raises, to exercise retries.
+    """
+
+    FREQ = {"1minute": "1min", "5minute": "5min", "30minute": "30min", "1day": "1D"}
+
+    def __init__(self, fail_every=0, delay=0.0):
+        self.fail_every = fail_every
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get_historical_data(self, interval, from_date, to_date, stock_code, **kwargs):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+        time.sleep(self.delay)
+        if self.fail_every and call % self.fail_every == 0:
+            raise ConnectionError("fake transient failure")
+
+        stamps = pd.date_range(
+            from_date[:10], f"{to_date[:10]} 23:59", freq=self.FREQ[interval]
+        )
+        if interval != "1day":
+            clock = stamps.strftime("%H:%M:%S")
+            stamps = stamps[(clock >= SESSION_OPEN) & (clock < SESSION_CLOSE)]
+        stamps = stamps[stamps.dayofweek < 5]
+
+        rng = np.random.default_rng(zlib.crc32(f"{stock_code}{from_date}".encode()))
+        close = 1000 + np.cumsum(rng.normal(0, 1, len(stamps)))
+        records = [
+            {
+                "datetime": str(ts),
+                "stock_code": stock_code,
+                "open": c - 0.5,
+                "high": c + 1,
+                "low": c - 1,
+                "close": c,
+                "volume": int(v),
+            }
+            for ts, c, v in zip(stamps, close, rng.integers(100, 10000, len(stamps)))
+        ]
+        return {"Success": records, "Status": 200, "Error": None}
+
+
+def breeze_session():
+    from breeze_connect import BreezeConnect
+
+    breeze = BreezeConnect(api_key=os.getenv("BREEZE_API_KEY"))
+    breeze.generate_session(
+        api_secret=os.getenv("BREEZE_API_SECRET"),
+        session_token=os.getenv("BREEZE_SESSION_TOKEN"),
+    )
+    return breeze
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download historical bars from Breeze")
+    parser.add_argument("codes", nargs="*", help="stock codes (default: config.json)")
+    parser.add_argument(
+        "--from", dest="start", required=True, help="first day, YYYY-MM-DD"
+    )
+    parser.add_argument(
+        "--to", dest="end", default=None, help="last day (default: today)"
+    )
+    parser.add_argument("--interval", default="1minute", choices=sorted(CHUNK_DAYS))
+    parser.add_argument("--exchange", default="NSE")
+    parser.add_argument("--product", default="cash")
+    parser.add_argument("--expiry", help="futures expiry, e.g. 2025-08-28")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--out", default=HISTORY_STORE_DIR, help="store folder")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument(
+        "--fake", action="store_true", help="use the offline fake client"
+    )
+    args = parser.parse_args()
+
+    codes = args.codes
+    if not codes:
+        with open(args.config) as f:
+            codes = [s["stock_code"] for s in json.load(f).get("stocks", [])]
+
+    request = {"exchange_code": args.exchange, "product_type": args.product}
+    if args.expiry:
+        request.update(
+            expiry_date=f"{args.expiry}T07:00:00.000Z", right="others", strike_price="0"
+        )
+
+    client = FakeBreezeClient() if args.fake else breeze_session()
+    downloader = BarDownloader(
+        client, args.interval, request, root=args.out, workers=args.workers
+    )
+    start = time.time()
+    summary = downloader.run(codes, args.start, args.end or pd.Timestamp.now().date())
+    print(f"[✓] Done in {time.time() - start:.1f}s: {summary}")
+
+
+if __name__ == "__main__":
+    main()
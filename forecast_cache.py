@@ -0,0 +1,107 @@
+# forecast_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_PATH = os.path.join("forecast", "cache.json")
+TTL = 60 * 60  # seconds a cached forecast stays valid
+MAX_ENTRIES = 512
+
+
+def cache_key(model, template, rows_csv):
+    # Same model + prompt wording + input rows -> same key
+    digest = hashlib.sha256()
+    for part in (model, template, rows_csv):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ForecastCache:
+    """Content-addressed LLM response cache with TTL and LRU eviction.
+
+    Entries live in an OrderedDict (least recently used first) and the whole
+    cache is rewritten atomically to a JSON file after every put, so it
+    survives dashboard restarts.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=TTL, max_entries=MAX_ENTRIES, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()  # one writer at a time, newest last
+        self.entries = OrderedDict()  # key -> (created, text)
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                rows = json.load(f)["entries"]
+        except (OSError, ValueError, KeyError):
+            return
+        now = self.clock()
+        for key, created, text in rows:
+            if now - created < self.ttl:
+                self.entries[key] = (created, text)
+
+    def save(self):
+        # Pool threads save concurrently; get() only waits for the snapshot
+        with self.save_lock:
+            with self.lock:
+                rows = [[key, created, text] for key, (created, text) in self.entries.items()]
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"entries": rows}, f)
+            os.replace(tmp, self.path)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if self.clock() - entry[0] >= self.ttl:
+                del self.entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, text):
+        with self.lock:
+            self.entries[key] = (self.clock(), text)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        try:
+            self.save()
+        except OSError as e:
+            print(f"[!] Could not save forecast cache: {e}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "size": len(self.entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,151 @@
+# forecast_service.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import groq_forecast
+from forecast_cache import cache_key
+from ratelimit import TokenBucket
+
+WORKERS = 2
+REQUESTS_PER_MINUTE = 30  # Groq free-tier limit
+BURST = 3
+TIMEOUT = 30  # seconds, for the rate-limit wait and for the API call each
+NUM_ROWS = 10
+
+
+class ForecastResult:
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self.status = "queued"  # queued -> running -> done | error
+        self.text = None
+        self.error = None
+        self.requested_at = time.time()
+        self.finished_at = None
+        self.cached = False
+
+    @property
+    def message(self):
+        return self.text if self.status == "done" else f"❌ Error during forecast: {self.error}"
+
+
+class ForecastService:
+    """Runs LLM forecasts on a small thread pool so the dashboard never waits.
+
+    submit() returns at once. Requests for a symbol that is already queued
+    or running collapse into a single follow-up with the newest data, calls
+    go through a token bucket shared by all workers, and finished results
+    are kept per symbol for the UI to read with latest(). With a
+    ForecastCache, unchanged input rows are answered without an API call.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        workers=WORKERS,
+        limiter=None,
+        timeout=TIMEOUT,
+        save=True,
+        cache=None,
+    ):
+        self.client = client  # None -> the Groq client in groq_forecast
+        self.cache = cache
+        self.limiter = limiter or TokenBucket.per_minute(REQUESTS_PER_MINUTE, BURST)
+        self.timeout = timeout
+        self.save = save
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="forecast")
+        self.lock = threading.Lock()
+        self.results = {}  # symbol -> last finished ForecastResult
+        self.in_flight = {}  # symbol -> queued/running ForecastResult
+        self.pending = {}  # symbol -> newest (df, num_rows) seen while in flight
+        self.coalesced = 0
+
+    def submit(self, symbol, df, num_rows=NUM_ROWS):
+        with self.lock:
+            if symbol in self.in_flight:
+                self.pending[symbol] = (df, num_rows)
+                self.coalesced += 1
+                return False
+            job = self.in_flight[symbol] = ForecastResult(symbol)
+        self.pool.submit(self._run, job, df, num_rows)
+        return True
+
+    def latest(self, symbol):
+        return self.results.get(symbol)
+
+    def busy(self, symbol):
+        return symbol in self.in_flight
+
+    def _run(self, job, df, num_rows):
+        try:
+            if len(df) < num_rows:
+                raise ValueError(f"not enough rows (found {len(df)}, expected {num_rows})")
+            rows_csv = df.tail(num_rows).to_csv(index=False)
+            key = cache_key(groq_forecast.MODEL, groq_forecast.build_prompt(""), rows_csv)
+
+            # Identical rows (e.g. market closed) cost neither a call nor a token
+            cached = self.cache.get(key) if self.cache else None
+            if cached is not None:
+                job.text, job.cached, job.status = cached, True, "done"
+                return
+
+            if not self.limiter.acquire(timeout=self.timeout):
+                raise TimeoutError(f"no rate-limit slot within {self.timeout}s")
+
+            job.status = "running"
+            prompt = groq_forecast.build_prompt(rows_csv)
+            job.text = groq_forecast.request_forecast(prompt, self.client, self.timeout)
+            if self.cache:
+                self.cache.put(key, job.text)
+            if self.save:
+                last = df.iloc[-1]
+                groq_forecast.save_forecast(
+                    job.symbol,
+                    job.text,
+                    input_end=last.get("Timestamp"),
+                    input_close=last.get("Close"),
+                    cache_key=key,
+                )
+            job.status = "done"
+        except Exception as e:
+            job.status = "error"
+            job.error = f"{type(e).__name__}: {e}"
+        finally:
+            job.finished_at = time.time()
+            with self.lock:
+                self.results[job.symbol] = job
+                del self.in_flight[job.symbol]
+                follow_up = self.pending.pop(job.symbol, None)
+            if follow_up:
+                self.submit(job.symbol, *follow_up)
+
+    def stats(self):
+        stats = {"coalesced": self.coalesced}
+        if self.cache:
+            stats.update(self.cache.stats())
+        return stats
+
+    def shutdown(self, wait=False):
+        self.pool.shutdown(wait=wait, cancel_futures=True)
+
+
+class StubClient:
+    """Offline stand-in for the Groq client (same chat.completions.create call)."""
+
+    def __init__(self, reply="Hold. Stub forecast.", delay=0.0):
+        self.reply = reply
+        self.delay = delay
+        self.calls = 0
+        self.chat = self
+        self.completions = self
+
+    def create(self, messages, timeout=None, **kwargs):
+        self.calls += 1
+        if timeout is not None and self.delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("stub request timed out")
+        time.sleep(self.delay)
+        message = type("Message", (), {"content": self.reply})
+        choice = type("Choice", (), {"message": message})
+        return type("Response", (), {"choices": [choice]})
@@ -0,0 +1,209 @@
+# forecast_store.py
+
+import argparse
+import glob
+import os
+import sqlite3
+import threading
+
+import pandas as pd
+
+DB_PATH = os.path.join("forecast", "forecasts.db")
+HORIZONS = (5, 15, 60)  # minutes after a forecast to measure the price move
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecasts (
+    id INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL,
+    created_at INTEGER NOT NULL,  -- local time, epoch ns (same clock as ticks)
+    model TEXT,
+    input_end INTEGER,            -- Timestamp of the last row sent to the model
+    input_close REAL,             -- its Close
+    cache_key TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS forecasts_symbol_time ON forecasts (symbol, created_at);
+"""
+
+COLUMNS = [
+    "id",
+    "symbol",
+    "created_at",
+    "model",
+    "input_end",
+    "input_close",
+    "cache_key",
+    "text",
+]
+
+
+def _ns(value):
+    return None if value is None or pd.isna(value) else pd.Timestamp(value).value
+
+
+class ForecastStore:
+    """Append-only forecast history in SQLite (WAL mode).
+
+    WAL lets any number of readers run alongside a writer, and the busy
+    timeout makes concurrent writers (forecast workers, other processes)
+    queue instead of failing. Each thread gets its own connection.
+    Range queries per symbol use the (symbol, created_at) index.
+    """
+
+    def __init__(self, path=DB_PATH, timeout=30):
+        self.path = path
+        self.timeout = timeout
+        self.local = threading.local()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL, far fewer fsyncs
+            self.local.conn = conn
+        return conn
+
+    def append(
+        self,
+        symbol,
+        text,
+        created_at=None,
+        model=None,
+        input_end=None,
+        input_close=None,
+        cache_key=None,
+    ):
+        conn = self._conn()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO forecasts (symbol, created_at, model, input_end,"
+                " input_close, cache_key, text) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    symbol.upper(),
+                    _ns(created_at if created_at is not None else pd.Timestamp.now()),
+                    model,
+                    _ns(input_end),
+                    None if input_close is None else float(input_close),
+                    cache_key,
+                    text,
+                ),
+            )
+        return cursor.lastrowid
+
+    def _frame(self, rows):
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        for name in ("created_at", "input_end"):
+            df[name] = pd.to_datetime(df[name], unit="ns")
+        return df
+
+    def range(self, symbol, start=None, end=None):
+        """Forecasts for a symbol with start <= created_at < end, oldest first."""
+        query = f"SELECT {', '.join(COLUMNS)} FROM forecasts WHERE symbol = ?"
+        params = [symbol.upper()]
+        if start is not None:
+            query += " AND created_at >= ?"
+            params.append(_ns(start))
+        if end is not None:
+            query += " AND created_at < ?"
+            params.append(_ns(end))
+        rows = self._conn().execute(query + " ORDER BY created_at", params).fetchall()
+        return self._frame(rows)
+
+    def latest(self, symbol, n=1):
+        rows = self._conn().execute(
+            f"SELECT {', '.join(COLUMNS)} FROM forecasts WHERE symbol = ?"
+            " ORDER BY created_at DESC LIMIT ?",
+            (symbol.upper(), n),
+        ).fetchall()
+        return self._frame(rows[::-1])
+
+    def symbols(self):
+        rows = self._conn().execute("SELECT DISTINCT symbol FROM forecasts ORDER BY symbol")
+        return [row[0] for row in rows]
+
+    def with_prices(self, symbol, prices, start=None, end=None, horizons=HORIZONS):
+        """Forecasts joined to the price at forecast time and `horizons` minutes later.
+
+        prices: frame with Timestamp and Close (live ticks or minute bars).
+        Adds Close_at, Close_{h}m and Return_{h}m columns for scoring.
+        """
+        forecasts = self.range(symbol, start, end)
+        prices = (
+            prices[["Timestamp", "Close"]]
+            .dropna()
+            .assign(Timestamp=lambda d: pd.to_datetime(d["Timestamp"]).astype("datetime64[ns]"))
+            .sort_values("Timestamp")
+        )
+        if forecasts.empty or prices.empty:
+            return forecasts
+
+        out = pd.merge_asof(
+            forecasts,
+            prices.rename(columns={"Timestamp": "created_at", "Close": "Close_at"}),
+            on="created_at",
+            direction="backward",
+        )
+        last_price = prices["Timestamp"].iloc[-1]
+        for minutes in horizons:
+            at = out["created_at"] + pd.Timedelta(minutes=minutes)
+            later = pd.merge_asof(
+                pd.DataFrame({"at": at}),
+                prices.rename(columns={"Timestamp": "at"}),
+                on="at",
+                direction="backward",
+            )["Close"]
+            # No price yet that far after the forecast -> leave NaN
+            out[f"Close_{minutes}m"] = later.where(at <= last_price).to_numpy()
+            out[f"Return_{minutes}m"] = (out[f"Close_{minutes}m"] / out["Close_at"] - 1) * 100
+        return out
+
+    def import_csv(self, symbol, path):
+        """Load a legacy forecast/LLM_data_{symbol}.csv log (Time, Forecast)."""
+        df = pd.read_csv(path)
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO forecasts (symbol, created_at, text) VALUES (?, ?, ?)",
+                [
+                    (symbol.upper(), _ns(time), text)
+                    for time, text in zip(pd.to_datetime(df["Time"]), df["Forecast"])
+                ],
+            )
+        return len(df)
+
+    def close(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Forecast history store")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument(
+        "--import-csv",
+        metavar="FOLDER",
+        help="import legacy LLM_data_*.csv logs from FOLDER",
+    )
+    parser.add_argument("--symbol", help="print this symbol's forecasts")
+    parser.add_argument("--since", help="only forecasts at or after this time")
+    args = parser.parse_args()
+
+    store = ForecastStore(args.db)
+    if args.import_csv:
+        for path in sorted(glob.glob(os.path.join(args.import_csv, "LLM_data_*.csv"))):
+            symbol = os.path.basename(path)[len("LLM_data_") : -len(".csv")]
+            print(f"[✓] {symbol}: imported {store.import_csv(symbol, path)} forecasts")
+    if args.symbol:
+        print(store.range(args.symbol, start=args.since).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
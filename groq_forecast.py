@@ -4,24 +4,18 @@ import os
 import pandas as pd
 from dotenv import load_dotenv
 from groq import Groq
-from datetime import datetime
+from forecast_store import ForecastStore
 
 load_dotenv()
 client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+_store = None
 
 
-def forecast_stock(stock_name: str, csv_file: str, num_rows: int = 10) -> str:
-    if not os.path.exists(csv_file):
-        return f"❌ CSV file not found: {csv_file}"
+MODEL = "allam-2-7b"
 
-    df = pd.read_csv(csv_file)
-    if df.shape[0] < num_rows:
-        return f"❌ Not enough rows in file (found {df.shape[0]}, expected {num_rows})"
-
-    latest_df = df.tail(num_rows)
-    latest_csv = latest_df.to_csv(index=False)
 
-    prompt = f"""You are a professional stock analyst. Analyze the following real-time stock data and determine the next trading action.
+def build_prompt(latest_csv: str) -> str:
+    return f"""You are a professional stock analyst. Analyze the following real-time stock data and determine the next trading action.
 
 Please provide:
 1. A clear recommendation (e.g., Buy, Sell, Hold, Set Stop Loss, Wait)
@@ -34,31 +28,52 @@ Only respond with concise and precise analysis.
 Here is the most recent data:
 {latest_csv}"""
 
-    try:
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a stock market expert."},
-                {"role": "user", "content": prompt},
-            ],
-            model="allam-2-7b",
-            temperature=0.4,
-            max_tokens=512,
-            top_p=1.0,
-            stream=False,
-        )
-
-        output_text = response.choices[0].message.content.strip()
-
-        # Save response to a timestamped CSV row
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        save_path = f"./forecast/LLM_data_{stock_name}.csv"
-        df_row = pd.DataFrame([[timestamp, output_text]], columns=["Time", "Forecast"])
-
-        if os.path.exists(save_path):
-            df_row.to_csv(save_path, mode="a", index=False, header=False)
-        else:
-            df_row.to_csv(save_path, index=False)
 
+def request_forecast(prompt: str, llm_client=None, timeout: float = None) -> str:
+    # Raises on API errors/timeouts; llm_client lets callers swap in a stub
+    llm_client = llm_client or client
+    options = {"timeout": timeout} if timeout else {}
+    response = llm_client.chat.completions.create(
+        messages=[
+            {"role": "system", "content": "You are a stock market expert."},
+            {"role": "user", "content": prompt},
+        ],
+        model=MODEL,
+        temperature=0.4,
+        max_tokens=512,
+        top_p=1.0,
+        stream=False,
+        **options,
+    )
+    return response.choices[0].message.content.strip()
+
+
+def save_forecast(stock_name: str, output_text: str, **details):
+    # Appends to the forecast history (forecast/forecasts.db); details are
+    # optional ForecastStore.append fields such as input_end/input_close
+    global _store
+    if _store is None:
+        _store = ForecastStore()
+    _store.append(stock_name, output_text, model=MODEL, **details)
+
+
+def forecast_stock(
+    stock_name: str, csv_file: str, num_rows: int = 10, df: pd.DataFrame = None
+) -> str:
+    # Callers that already hold the latest rows (e.g. the dashboard) pass df
+    if df is None:
+        if not os.path.exists(csv_file):
+            return f"❌ CSV file not found: {csv_file}"
+        df = pd.read_csv(csv_file)
+
+    if df.shape[0] < num_rows:
+        return f"❌ Not enough rows in file (found {df.shape[0]}, expected {num_rows})"
+
+    latest_csv = df.tail(num_rows).to_csv(index=False)
+
+    try:
+        output_text = request_forecast(build_prompt(latest_csv))
+        save_forecast(stock_name, output_text)
         return output_text
 
     except Exception as e:
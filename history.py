@@ -0,0 +1,91 @@
+# history.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from schema import (
+    HISTORY_BAR_DTYPE,
+    PRICE_COLUMNS,
+    as_price,
+    normalize_frame,
+    to_frame,
+    to_records,
+)
+
+HISTORY_DIR = os.path.join("stocksinfo", "stock_csv")
+NORMALIZED_DIR = ".normalized"  # parsed bars per CSV, rebuilt when the CSV changes
+
+
+def history_path(stock_code, folder=HISTORY_DIR):
+    return os.path.join(folder, f"latest_data_{stock_code}.csv")
+
+
+def available_codes(folder=HISTORY_DIR):
+    return sorted(
+        name[len("latest_data_") : -len(".csv")]
+        for name in os.listdir(folder)
+        if name.startswith("latest_data_") and name.endswith(".csv")
+    )
+
+
+def normalized_path(stock_code, folder=HISTORY_DIR):
+    return os.path.join(folder, NORMALIZED_DIR, f"{stock_code}.npy")
+
+
+def load_minute_bars(stock_code, folder=HISTORY_DIR):
+    """Minute bars in the schema's HISTORY_BAR_DTYPE columns.
+
+    The CSV is parsed once and kept as a compact .npy next to it; later
+    loads skip the rename/datetime parsing until the CSV is modified.
+    Prices come back as float64 (see as_price) for backtest arithmetic.
+    """
+    source = history_path(stock_code, folder)
+    cached = normalized_path(stock_code, folder)
+    try:
+        if os.path.getmtime(cached) >= os.path.getmtime(source):
+            return _with_float_prices(to_frame(np.load(cached)))
+    except (OSError, ValueError):
+        pass
+
+    df = normalize_frame(pd.read_csv(source), HISTORY_BAR_DTYPE)
+    df = df.sort_values("Timestamp", kind="stable").reset_index(drop=True)
+    try:
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        tmp = f"{cached}.tmp.npy"
+        np.save(tmp, to_records(df, HISTORY_BAR_DTYPE))
+        os.replace(tmp, cached)
+    except OSError as e:
+        print(f"[!] Could not cache normalized bars for {stock_code}: {e}")
+    return _with_float_prices(df)
+
+
+def _with_float_prices(df):
+    for name in PRICE_COLUMNS:
+        df[name] = as_price(df[name])
+    return df
+
+
+PANEL_FIELDS = ("Timestamp", "Open", "High", "Low", "Close", "Volume")
+
+
+def stack_bars(frames, fields=PANEL_FIELDS):
+    """(bar number x symbols) frame per field from {code: bars}.
+
+    Row i holds each symbol's own i-th bar, so rolling/EWM windows over a
+    column only ever see that symbol's bars; shorter histories are padded
+    with NaN (NaT for Timestamp) at the end. Nothing is filled or dropped.
+    """
+    return {
+        field: pd.DataFrame(
+            {code: df[field].reset_index(drop=True) for code, df in frames.items()}
+        )
+        for field in fields
+    }
+
+
+def load_panel(codes=None, fields=PANEL_FIELDS, folder=HISTORY_DIR):
+    """stack_bars over load_minute_bars for many stocks at once."""
+    codes = codes or available_codes(folder)
+    return stack_bars({code: load_minute_bars(code, folder) for code in codes}, fields)
@@ -1,5 +1,8 @@
 # indicator.py
 
+from collections import deque
+from math import sqrt
+
 import pandas as pd
 import numpy as np
 
@@ -72,12 +75,106 @@ def compute_adx(df, period):
     return df
 
 
+def add_indicators_panel(panel, config):
+    """Vectorized add_indicators for many stocks at once.
+
+    `panel` maps "High"/"Low"/"Close" (and optionally "Timestamp") to
+    (bar number x symbols) DataFrames from history.stack_bars/load_panel.
+    Every rolling/EWM call runs once over all columns. Returns a dict of
+    output column -> DataFrame; panel_symbol() gives one stock's rows.
+    """
+    close, high, low = panel["Close"], panel["High"], panel["Low"]
+    out = {"High": high, "Low": low, "Close": close}
+    if "Timestamp" in panel:
+        out = {"Timestamp": panel["Timestamp"], **out}
+
+    # Moving Averages
+    ma_fast = config.get("moving_averages", {}).get("ma_fast", 5)
+    ma_slow = config.get("moving_averages", {}).get("ma_slow", 20)
+    out["MA_Fast"] = close.rolling(window=ma_fast).mean()
+    out["MA_Slow"] = close.rolling(window=ma_slow).mean()
+
+    # Bollinger Bands
+    bb_cfg = config.get("bollinger", {})
+    period = bb_cfg.get("period", 20)
+    std_dev = bb_cfg.get("std_dev", 2)
+    out["BB_Mid"] = close.rolling(window=period).mean()
+    out["BB_Std"] = close.rolling(window=period).std()
+    out["BB_Upper"] = out["BB_Mid"] + (out["BB_Std"] * std_dev)
+    out["BB_Lower"] = out["BB_Mid"] - (out["BB_Std"] * std_dev)
+
+    # MACD
+    macd_cfg = config.get("macd", {})
+    fast = macd_cfg.get("fast_period", 12)
+    slow = macd_cfg.get("slow_period", 26)
+    signal_period = macd_cfg.get("signal_period", 9)
+    ema_fast = close.ewm(span=fast, adjust=False).mean()
+    ema_slow = close.ewm(span=slow, adjust=False).mean()
+    out["MACD"] = ema_fast - ema_slow
+    out["MACD_Signal"] = out["MACD"].ewm(span=signal_period, adjust=False).mean()
+    out["MACD_Hist"] = out["MACD"] - out["MACD_Signal"]
+
+    # ADX
+    adx_period = config.get("adx", {}).get("period", 14)
+    out.update(compute_adx_panel(high, low, close, adx_period))
+
+    return out
+
+
+def compute_adx_panel(high, low, close, period):
+    up = high.diff()
+    down = low.diff()
+    plus_dm = up.where((up > down) & (up > 0), 0.0)
+    minus_dm = down.where((down > up) & (down > 0), 0.0)
+
+    prev_close = close.shift(1)
+    tr1 = high - low
+    tr2 = (high - prev_close).abs()
+    tr3 = (low - prev_close).abs()
+    # fmax skips NaN like DataFrame.max(axis=1) in compute_adx
+    tr = pd.DataFrame(
+        np.fmax(np.fmax(tr1.to_numpy(), tr2.to_numpy()), tr3.to_numpy()),
+        index=high.index,
+        columns=high.columns,
+    )
+
+    tr_avg = tr.ewm(span=period, adjust=False).mean()
+    plus_di = 100 * (plus_dm.ewm(span=period, adjust=False).mean() / tr_avg)
+    minus_di = 100 * (minus_dm.ewm(span=period, adjust=False).mean() / tr_avg)
+    dx = 100 * ((plus_di - minus_di).abs() / (plus_di + minus_di))
+
+    return {
+        "UpMove": up,
+        "DownMove": down,
+        "+DM": plus_dm,
+        "-DM": minus_dm,
+        "TR_tmp1": tr1,
+        "TR_tmp2": tr2,
+        "TR_tmp3": tr3,
+        "TR": tr,
+        "+DI": plus_di,
+        "-DI": minus_di,
+        "DX": dx,
+        "ADX": dx.ewm(span=period, adjust=False).mean(),
+    }
+
+
+def panel_symbol(result, symbol):
+    """One symbol's add_indicators_panel rows, without the end padding."""
+    df = pd.DataFrame({column: frame[symbol] for column, frame in result.items()})
+    last = df["Timestamp" if "Timestamp" in df else "Close"].last_valid_index()
+    return df.iloc[:0] if last is None else df.loc[:last]
+
+
 def is_breakout(df, resistance, support, config):
     if len(df) < 5:
         return None, None, None, "Insufficient data"
 
-    current = df.iloc[-1]
+    return check_levels(df.iloc[-1], resistance, support, config)
+
 
+def check_levels(current, resistance, support, config):
+    # Breakout rule for a single row (Series or dict with "Close")
     close = current["Close"]
     # volume = current["Volume"]
     # vol_thresh = config.get("volume_threshold", 0)
@@ -125,3 +222,223 @@ def is_breakout(df, resistance, support, config):
         # return "breakdown", close, support, reason
 
     return None, None, None, "No breakout/breakdown"
+
+
+# === Incremental indicator engine ===
+# Keeps per-stock running state so each new tick costs O(1) instead of
+# recomputing every rolling/EWM column over the whole window.
+
+INDICATOR_COLUMNS = [
+    "MA_Fast",
+    "MA_Slow",
+    "BB_Mid",
+    "BB_Std",
+    "BB_Upper",
+    "BB_Lower",
+    "MACD",
+    "MACD_Signal",
+    "MACD_Hist",
+    "UpMove",
+    "DownMove",
+    "+DM",
+    "-DM",
+    "TR_tmp1",
+    "TR_tmp2",
+    "TR_tmp3",
+    "TR",
+    "+DI",
+    "-DI",
+    "DX",
+    "ADX",
+]
+
+NAN = float("nan")
+
+
+def indicator_params(config):
+    ma = config.get("moving_averages", {})
+    bb = config.get("bollinger", {})
+    macd = config.get("macd", {})
+    return (
+        ma.get("ma_fast", 5),
+        ma.get("ma_slow", 20),
+        bb.get("period", 20),
+        bb.get("std_dev", 2),
+        macd.get("fast_period", 12),
+        macd.get("slow_period", 26),
+        macd.get("signal_period", 9),
+        config.get("adx", {}).get("period", 14),
+    )
+
+
+class _RollingStats:
+    """Sliding-window mean/std matching pandas rolling(window) with ddof=1."""
+
+    def __init__(self, window):
+        self.window = int(window)
+        self.values = deque()
+        self.anchor = None
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nan_count = 0
+        self.pushes = 0
+
+    def push(self, x):
+        if self.anchor is None and x == x:
+            self.anchor = x
+
+        self.values.append(x)
+        self._add(x, 1.0)
+        if len(self.values) > self.window:
+            self._add(self.values.popleft(), -1.0)
+
+        # Periodically rebuild the sums around the current mean so that
+        # floating point drift from add/remove never accumulates.
+        self.pushes += 1
+        if self.pushes >= self.window:
+            self._resync()
+
+    def _add(self, x, sign):
+        if x != x:
+            self.nan_count += int(sign)
+            return
+        d = x - self.anchor
+        self.total += sign * d
+        self.total_sq += sign * d * d
+
+    def _resync(self):
+        self.pushes = 0
+        valid = [v for v in self.values if v == v]
+        if valid:
+            self.anchor = sum(valid) / len(valid)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.nan_count = 0
+        for v in self.values:
+            self._add(v, 1.0)
+
+    def ready(self):
+        return len(self.values) == self.window and self.nan_count == 0
+
+    def mean(self):
+        if not self.ready():
+            return NAN
+        return self.anchor + self.total / self.window
+
+    def std(self):
+        n = self.window
+        if not self.ready() or n < 2:
+            return NAN
+        var = (self.total_sq - self.total * self.total / n) / (n - 1)
+        return sqrt(var) if var > 0 else 0.0
+
+
+class _EWMean:
+    """Recursive ewm(span=..., adjust=False).mean(), including pandas NaN handling."""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (float(span) + 1.0)
+        self.value = NAN
+        self.old_wt = 1.0
+
+    def push(self, x):
+        if self.value == self.value:
+            self.old_wt *= 1.0 - self.alpha
+            if x == x:
+                if self.value != x:
+                    self.value = (self.old_wt * self.value + self.alpha * x) / (
+                        self.old_wt + self.alpha
+                    )
+                self.old_wt = 1.0
+        elif x == x:
+            self.value = x
+        return self.value
+
+
+def _div(a, b):
+    # Same results as pandas/numpy division: x/0 -> +-inf, 0/0 -> NaN.
+    if b == 0:
+        if a != a or a == 0:
+            return NAN
+        return float("inf") if a > 0 else float("-inf")
+    return a / b
+
+
+class IncrementalIndicators:
+    """Stateful per-stock equivalent of add_indicators, updated one tick at a time."""
+
+    def __init__(self, config):
+        self.params = indicator_params(config)
+        self.std_dev = self.params[3]
+        self.reset()
+
+    def reset(self):
+        ma_fast, ma_slow, bb_period, _, fast, slow, signal, adx = self.params
+        self.ma_fast = _RollingStats(ma_fast)
+        self.ma_slow = _RollingStats(ma_slow)
+        self.bb = _RollingStats(bb_period)
+        self.ema_fast = _EWMean(fast)
+        self.ema_slow = _EWMean(slow)
+        self.macd_signal = _EWMean(signal)
+        self.plus_dm = _EWMean(adx)
+        self.minus_dm = _EWMean(adx)
+        self.tr = _EWMean(adx)
+        self.adx = _EWMean(adx)
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.prev_close = NAN
+        self.last = None  # newest update()'s output
+
+    def matches(self, config):
+        return indicator_params(config) == self.params
+
+    def update(self, high, low, close):
+        high, low, close = float(high), float(low), float(close)
+        out = {}
+
+        self.ma_fast.push(close)
+        self.ma_slow.push(close)
+        self.bb.push(close)
+        out["MA_Fast"] = self.ma_fast.mean()
+        out["MA_Slow"] = self.ma_slow.mean()
+        out["BB_Mid"] = self.bb.mean()
+        out["BB_Std"] = self.bb.std()
+        out["BB_Upper"] = out["BB_Mid"] + out["BB_Std"] * self.std_dev
+        out["BB_Lower"] = out["BB_Mid"] - out["BB_Std"] * self.std_dev
+
+        macd = self.ema_fast.push(close) - self.ema_slow.push(close)
+        out["MACD"] = macd
+        out["MACD_Signal"] = self.macd_signal.push(macd)
+        out["MACD_Hist"] = macd - out["MACD_Signal"]
+
+        up = high - self.prev_high
+        down = low - self.prev_low
+        plus_dm = up if (up > down and up > 0) else 0.0
+        minus_dm = down if (down > up and down > 0) else 0.0
+        tr_parts = (high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        valid_tr = [t for t in tr_parts if t == t]
+        tr = max(valid_tr) if valid_tr else NAN
+
+        out["UpMove"] = up
+        out["DownMove"] = down
+        out["+DM"] = plus_dm
+        out["-DM"] = minus_dm
+        out["TR_tmp1"], out["TR_tmp2"], out["TR_tmp3"] = tr_parts
+        out["TR"] = tr
+
+        tr_avg = self.tr.push(tr)
+        plus_di = 100 * _div(self.plus_dm.push(plus_dm), tr_avg)
+        minus_di = 100 * _div(self.minus_dm.push(minus_dm), tr_avg)
+        dx = 100 * _div(abs(plus_di - minus_di), plus_di + minus_di)
+        out["+DI"] = plus_di
+        out["-DI"] = minus_di
+        out["DX"] = dx
+        out["ADX"] = self.adx.push(dx)
+
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+        self.last = out
+        return out
+
+    def update_frame(self, df):
+        for high, low, close in zip(df["High"], df["Low"], df["Close"]):
+            self.update(high, low, close)
@@ -0,0 +1,312 @@
+# metrics.py
+
+import argparse
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Off unless METRICS=1: every metric is then a shared no-op object
+ENABLED = os.getenv("METRICS", "").lower() in ("1", "true", "yes", "on")
+METRICS_DIR = "metrics"  # one JSON dump per process, refreshed every DUMP_INTERVAL
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+DUMP_INTERVAL = 10
+
+# Histogram upper bounds in seconds: 10µs .. 10s in 1 / 2.5 / 5 steps
+BUCKETS = tuple(round(m * 10.0**e, 6) for e in range(-5, 1) for m in (1, 2.5, 5))
+BUCKETS += (10.0,)
+
+_REGISTRY = {}  # name -> metric
+_PROCESS = {"name": None}
+
+
+class _Timer:
+    __slots__ = ("histogram", "label", "start")
+
+    def __init__(self, histogram, label):
+        self.histogram = histogram
+        self.label = label
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, self.label)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help, label=None):
+        self.name = name
+        self.help = help
+        self.label = label  # optional label name, e.g. "symbol"
+        self.values = {}  # label value ("" when unlabelled) -> sample
+
+    def remove(self, label=""):
+        self.values.pop(label, None)
+
+    def snapshot(self):
+        return {
+            "type": self.kind,
+            "help": self.help,
+            "label": self.label,
+            "values": dict(self.values),
+        }
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, label=""):
+        self.values[label] = self.values.get(label, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, label=""):
+        self.values[label] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def observe(self, seconds, label=""):
+        sample = self.values.get(label)
+        if sample is None:
+            sample = self.values[label] = [[0] * (len(BUCKETS) + 1), 0.0]
+        sample[0][bisect.bisect_left(BUCKETS, seconds)] += 1
+        sample[1] += seconds
+
+    def time(self, label=""):
+        """Context manager observing the wall time of its block."""
+        return _Timer(self, label)
+
+    def snapshot(self):
+        snap = super().snapshot()
+        snap["buckets"] = BUCKETS
+        snap["values"] = {
+            label: {"counts": list(counts), "sum": total}
+            for label, (counts, total) in snap["values"].items()
+        }
+        return snap
+
+
+class _Noop:
+    _null = nullcontext()
+
+    def inc(self, amount=1, label=""):
+        pass
+
+    def set(self, value, label=""):
+        pass
+
+    def observe(self, seconds, label=""):
+        pass
+
+    def remove(self, label=""):
+        pass
+
+    def time(self, label=""):
+        return self._null
+
+
+NOOP = _Noop()
+
+
+def _metric(cls, name, help, label):
+    if not ENABLED:
+        return NOOP
+    metric = _REGISTRY.get(name)
+    if metric is None:
+        metric = _REGISTRY[name] = cls(name, help, label)
+    return metric
+
+
+def counter(name, help, label=None):
+    return _metric(Counter, name, help, label)
+
+
+def gauge(name, help, label=None):
+    return _metric(Gauge, name, help, label)
+
+
+def histogram(name, help, label=None):
+    return _metric(Histogram, name, help, label)
+
+
+# --- per-process dumps ------------------------------------------------------
+
+
+def snapshot():
+    return {
+        "process": _PROCESS["name"],
+        "pid": os.getpid(),
+        "time": time.time(),
+        "metrics": {name: m.snapshot() for name, m in list(_REGISTRY.items())},
+    }
+
+
+def dump():
+    if not ENABLED or _PROCESS["name"] is None:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"{_PROCESS['name']}.json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(snapshot(), f)
+    os.replace(tmp, path)
+
+
+def _dump_loop():
+    while True:
+        time.sleep(DUMP_INTERVAL)
+        try:
+            dump()
+        except Exception as e:
+            print(f"[Metrics Error] {type(e).__name__}: {e}")
+
+
+def start(process):
+    """Record metrics for this process under `process` and dump them periodically.
+
+    Values inherited from a forking parent are dropped first, so nothing is
+    counted twice.
+    """
+    if not ENABLED:
+        return
+    for metric in _REGISTRY.values():
+        metric.values.clear()
+    _PROCESS["name"] = process
+    threading.Thread(target=_dump_loop, daemon=True).start()
+
+
+def load_dumps(folder=METRICS_DIR):
+    dumps = []
+    if not os.path.isdir(folder):
+        return dumps
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(folder, name)) as f:
+                dumps.append(json.load(f))
+        except (OSError, ValueError):
+            continue  # replaced mid-read; the next scrape gets it
+    return dumps
+
+
+# --- Prometheus text format ---------------------------------------------------
+
+
+def _labels(process, label, value, extra=""):
+    pairs = [f'process="{process}"']
+    if label:
+        pairs.append(f'{label}="{value}"')
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}"
+
+
+def to_prometheus(dumps):
+    """Dumps -> Prometheus exposition text, one `process` label per dump."""
+    families = {}
+    for d in dumps:
+        for name, metric in d["metrics"].items():
+            families.setdefault(name, []).append((d["process"], metric))
+
+    lines = []
+    for name in sorted(families):
+        first = families[name][0][1]
+        lines.append(f"# HELP {name} {first['help']}")
+        lines.append(f"# TYPE {name} {first['type']}")
+        for process, metric in families[name]:
+            label = metric["label"]
+            for value, sample in sorted(metric["values"].items()):
+                if metric["type"] != "histogram":
+                    lines.append(f"{name}{_labels(process, label, value)} {sample}")
+                    continue
+                cumulative = 0
+                bounds = [str(b) for b in metric["buckets"]] + ["+Inf"]
+                for bound, count in zip(bounds, sample["counts"]):
+                    cumulative += count
+                    tags = _labels(process, label, value, f'le="{bound}"')
+                    lines.append(f"{name}_bucket{tags} {cumulative}")
+                tags = _labels(process, label, value)
+                lines.append(f"{name}_sum{tags} {sample['sum']}")
+                lines.append(f"{name}_count{tags} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def collect():
+    # Other processes' latest dumps plus this process's live values
+    own = _PROCESS["name"]
+    dumps = [d for d in load_dumps() if d["process"] != own]
+    if own is not None:
+        dumps.append(snapshot())
+    return dumps
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = to_prometheus(collect()).encode()
+            content_type = "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body = json.dumps(collect()).encode()
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood the console
+
+
+def serve(process="server", port=METRICS_PORT):
+    """Start recording for the server and expose every process's metrics.
+
+    Clears dumps left by a previous run, then serves /metrics (Prometheus
+    text) and /metrics.json on localhost from a daemon thread.
+    """
+    if not ENABLED:
+        return None
+    if os.path.isdir(METRICS_DIR):
+        for name in os.listdir(METRICS_DIR):
+            os.remove(os.path.join(METRICS_DIR, name))
+    start(process)
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    except OSError as e:
+        print(f"[Metrics Error] port {port} unavailable ({e}); JSON dumps only")
+        return None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[📈 METRICS] http://127.0.0.1:{port}/metrics")
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the latest metric dumps")
+    parser.add_argument("--json", action="store_true", help="raw JSON dumps")
+    parser.add_argument("--dir", default=METRICS_DIR)
+    args = parser.parse_args()
+
+    dumps = load_dumps(args.dir)
+    print(json.dumps(dumps, indent=2) if args.json else to_prometheus(dumps).rstrip())
+
+
+if __name__ == "__main__":
+    main()
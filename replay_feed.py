@@ -0,0 +1,256 @@
+# replay_feed.py
+#
+# Replays stocksinfo/stock_csv/latest_data_*.csv as a Breeze websocket feed,
+# keeping the bars' spacing divided by a speed factor:
+#   python server.py --replay [--speed 1|10|100|max] [--ticks-per-bar 1|4]
+#   python replay_feed.py [STOCK_CODE ...] [--speed max]   # feed alone
+
+import argparse
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from history import HISTORY_DIR, available_codes, load_minute_bars
+
+LTT_FORMAT = "%a %b %d %H:%M:%S %Y"  # Breeze's last-traded-time format
+MAX_GAP = 60  # market seconds; longer gaps (overnight, halts) replay as this
+SETTLE = 1.0  # seconds without new subscriptions before playback starts
+BEHIND_AFTER = 1.0  # wall seconds late before the feed counts as falling behind
+REPORT_INTERVAL = 5
+
+
+def parse_speed(value):
+    """Speed factor from "10", "10x" or "max" (0: no pacing)."""
+    if str(value).lower() == "max":
+        return 0.0
+    speed = float(str(value).lower().rstrip("x"))
+    if speed <= 0:
+        raise ValueError(f"speed must be positive or 'max': {value!r}")
+    return speed
+
+
+def bar_ticks(stock_code, bars, ticks_per_bar=1):
+    """(market time ns, Breeze tick dict) for each minute bar, oldest first.
+
+    One tick per bar carries the bar's OHLC, so the live monitor sees what
+    the backtest sees. Four ticks walk open -> low/high -> close 15s apart,
+    each with the bar's high/low so far.
+    """
+    day_volume = 0
+    day = None
+    for ts, o, h, l, c, v in zip(
+        bars["Timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64),
+        bars["Open"].to_numpy(),
+        bars["High"].to_numpy(),
+        bars["Low"].to_numpy(),
+        bars["Close"].to_numpy(),
+        bars["Volume"].to_numpy(),
+    ):
+        if ts // 86_400_000_000_000 != day:
+            day, day_volume, day_open = ts // 86_400_000_000_000, 0, o
+        if ticks_per_bar == 1:
+            path = [(0, c, h, l)]
+        else:
+            # Bullish bars usually dip first, bearish ones rally first
+            first, second = (l, h) if c >= o else (h, l)
+            path = [
+                (0, o, o, o),
+                (15, first, max(o, first), min(o, first)),
+                (30, second, h, l),
+                (45, c, h, l),
+            ]
+        for i, (offset, price, high, low) in enumerate(path):
+            qty = int(v) // len(path) + (int(v) % len(path) if i == 0 else 0)
+            day_volume += qty
+            tick_ts = int(ts) + offset * 1_000_000_000
+            yield tick_ts, {
+                "symbol": f"4.1!{stock_code}",  # routed by token, like Breeze
+                "open": float(o),
+                "last": float(price),
+                "high": float(high),
+                "low": float(low),
+                "close": float(day_open),  # previous close isn't in the CSV
+                "change": round(float(price - day_open), 2),
+                "ltq": qty,
+                "ttq": day_volume,
+                "avgPrice": float(price),
+                "ltt": pd.Timestamp(tick_ts).strftime(LTT_FORMAT),
+                "exchange": "NSE Equity",
+                "stock_name": stock_code,
+            }
+
+
+class ReplayBreeze:
+    """Stands in for BreezeConnect in start_feed_hub, replaying minute bars.
+
+    Every subscribed stock with a history CSV is merged into one stream in
+    market-time order. Tick i is due `elapsed market time / speed` after
+    the first one (gaps capped at MAX_GAP); speed 0 replays flat out.
+    Stocks subscribed mid-replay join at the current market time. The
+    delay between a tick's due time and its delivery shows whether the hub
+    keeps up; it is printed every REPORT_INTERVAL and at the end.
+    """
+
+    def __init__(self, speed=1.0, ticks_per_bar=1, folder=HISTORY_DIR):
+        self.speed = speed
+        self.ticks_per_bar = ticks_per_bar
+        self.folder = folder
+        self.on_ticks = None
+
+        self.lock = threading.Lock()
+        self.streams = []  # heap of (next tick time, order, stock_code, tick, iterator)
+        self.order = itertools.count()  # tie-breaker, ticks never get compared
+        self.subscribed = set()
+        self.last_subscribe = None
+        self.market_now = None  # time of the newest delivered tick
+
+        self.delivered = 0
+        self.lags = deque(maxlen=10_000)  # seconds between due and delivered
+        self.max_lag = 0.0
+        self.done = threading.Event()
+
+    def generate_session(self, **kwargs):
+        pass
+
+    def get_stock_token_value(self, stock_code, **kwargs):
+        return f"4.1!{stock_code}", f"4.2!{stock_code}"
+
+    def subscribe_feeds(self, stock_code, **kwargs):
+        if stock_code not in available_codes(self.folder):
+            raise ValueError(f"no history CSV for {stock_code} in {self.folder}")
+        ticks = bar_ticks(
+            stock_code, load_minute_bars(stock_code, self.folder), self.ticks_per_bar
+        )
+        with self.lock:
+            self.subscribed.add(stock_code)
+            self.last_subscribe = time.monotonic()
+            self.streams = [s for s in self.streams if s[2] != stock_code]
+            heapq.heapify(self.streams)
+            for ts, tick in ticks:
+                if self.market_now is None or ts >= self.market_now:
+                    self._push(ts, stock_code, tick, ticks)
+                    break
+
+    def unsubscribe_feeds(self, stock_code, **kwargs):
+        with self.lock:
+            self.subscribed.discard(stock_code)
+
+    def ws_connect(self):
+        threading.Thread(target=self._play, daemon=True).start()
+
+    def _push(self, ts, stock_code, tick, ticks):
+        heapq.heappush(self.streams, (ts, next(self.order), stock_code, tick, ticks))
+
+    def _next(self):
+        with self.lock:
+            while self.streams:
+                ts, _, code, tick, ticks = heapq.heappop(self.streams)
+                if code not in self.subscribed:
+                    continue  # unsubscribed: drop the rest of its stream
+                following = next(ticks, None)
+                if following is not None:
+                    self._push(following[0], code, following[1], ticks)
+                self.market_now = ts
+                return ts, tick
+        return None
+
+    def _play(self):
+        try:
+            self._replay()
+        finally:
+            self.done.set()
+
+    def _replay(self):
+        while (
+            self.last_subscribe is None
+            or time.monotonic() - self.last_subscribe < SETTLE
+        ):
+            time.sleep(0.1)
+
+        start = time.monotonic()
+        market_prev = None
+        market_elapsed = 0.0
+        last_report = start
+        while True:
+            item = self._next()
+            if item is None:
+                break
+            ts, tick = item
+            if market_prev is None:
+                market_prev = ts
+            market_elapsed += min((ts - market_prev) / 1e9, MAX_GAP)
+            market_prev = ts
+
+            due = (
+                start + market_elapsed / self.speed if self.speed else time.monotonic()
+            )
+            wait = due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.on_ticks(tick)
+            lag = max(time.monotonic() - due, 0.0)
+            self.lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            self.delivered += 1
+
+            if time.monotonic() - last_report >= REPORT_INTERVAL:
+                last_report = time.monotonic()
+                print(self.report(start, market_elapsed))
+
+        print(self.report(start, market_elapsed, final=True))
+
+    def report(self, start, market_elapsed, final=False):
+        wall = time.monotonic() - start
+        rate = self.delivered / wall if wall > 0 else 0.0
+        effective = market_elapsed / wall if wall > 0 else 0.0
+        speed = f"{self.speed:g}x" if self.speed else "max"
+        clock = (
+            pd.Timestamp(self.market_now).strftime("%Y-%m-%d %H:%M")
+            if self.market_now is not None
+            else "-"
+        )
+        line = (
+            f"{clock} | {self.delivered} ticks, {len(self.subscribed)} stocks"
+            f" | {rate:,.0f} ticks/s, {effective:,.0f}x market time (target {speed})"
+        )
+        if self.speed and self.lags:
+            p50, p99 = np.percentile(self.lags, [50, 99]) * 1000
+            behind = self.lags[-1] > BEHIND_AFTER
+            line += (
+                f" | lag p50={p50:.1f}ms p99={p99:.1f}ms max={self.max_lag * 1000:.0f}ms"
+                f" | {'FALLING BEHIND' if behind else 'keeping up'}"
+            )
+        tag = "[⏹ REPLAY DONE]" if final else "[⏩ REPLAY]"
+        return f"{tag} {line}"
+
+
+def start_replay_hub(commands, speed=1.0, ticks_per_bar=1, namespace="replay"):
+    """The feed hub with ReplayBreeze in place of the Breeze websocket."""
+    from collector import start_feed_hub
+
+    start_feed_hub(commands, ReplayBreeze(speed, ticks_per_bar), namespace)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay history CSVs as a tick feed")
+    parser.add_argument("codes", nargs="*", help="stock codes (default: all)")
+    parser.add_argument("--speed", default="max", help="1, 10, 100, ... or max")
+    parser.add_argument("--ticks-per-bar", type=int, choices=(1, 4), default=1)
+    args = parser.parse_args()
+
+    # Without the server: measures how fast the feed itself can go
+    feed = ReplayBreeze(parse_speed(args.speed), args.ticks_per_bar)
+    feed.on_ticks = lambda tick: None
+    for code in args.codes or available_codes():
+        feed.subscribe_feeds(stock_code=code)
+    feed.ws_connect()
+    feed.done.wait()
+
+
+if __name__ == "__main__":
+    main()
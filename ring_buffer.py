@@ -0,0 +1,143 @@
+# ring_buffer.py
+
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# Per-tick layout shared by the collector (writer) and monitor (reader)
+from schema import TICK_DTYPE
+
+# Header layout (int64 slots): seqlock counter, rows written, capacity, pid
+# of the creating process.
+_SEQ, _COUNT, _CAPACITY, _OWNER = 0, 1, 2, 3
+_HEADER_SLOTS = 8
+_HEADER_BYTES = _HEADER_SLOTS * 8
+
+
+def ring_name(stock_code, namespace=""):
+    # Shared memory names are global: runs that may overlap (live, replay)
+    # each use their own namespace
+    prefix = f"ticks_{namespace}_" if namespace else "ticks_"
+    return f"{prefix}{stock_code.upper()}"
+
+
+def _running(pid):
+    if pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def start_resource_tracker():
+    # Call in the server before starting workers so they inherit its tracker
+    # instead of each launching one that would unlink our rings on exit.
+    resource_tracker.ensure_running()
+
+
+def _attach_untracked(name):
+    # Only the creating process owns (and unlinks) the segment. Before 3.13
+    # there is no track flag, but our workers are children of the server and
+    # share its resource tracker, so attaching there doesn't change ownership.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class TickRing:
+    """Single-writer, multi-reader ring of ticks in shared memory.
+
+    The writer bumps the sequence counter to an odd value, writes the row
+    in place, then bumps it back to even. Readers retry whenever the
+    counter was odd or changed while they copied, so they never see torn rows.
+    """
+
+    def __init__(self, shm, owner=False):
+        self.shm = shm
+        self.owner = owner
+        self.header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        self.capacity = int(self.header[_CAPACITY])
+        self.rows = np.ndarray(
+            (self.capacity,), dtype=TICK_DTYPE, buffer=shm.buf, offset=_HEADER_BYTES
+        )
+
+    @classmethod
+    def create(cls, name, capacity=500):
+        size = _HEADER_BYTES + capacity * TICK_DTYPE.itemsize
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Reuse the name only if it was left behind by a run that didn't
+            # shut down cleanly, never while its creator is still writing
+            stale = _attach_untracked(name)
+            owner = int(np.ndarray((_HEADER_SLOTS,), np.int64, stale.buf)[_OWNER])
+            stale.close()
+            if owner != os.getpid() and _running(owner):
+                raise FileExistsError(f"{name} is in use by process {owner}")
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+        header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = 0
+        header[_CAPACITY] = capacity
+        header[_OWNER] = os.getpid()
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(_attach_untracked(name))
+
+    @property
+    def count(self):
+        return int(self.header[_COUNT])
+
+    def append(self, row):
+        header = self.header
+        count = int(header[_COUNT])
+        values = tuple(row[name] for name in TICK_DTYPE.names)
+
+        header[_SEQ] += 1
+        self.rows[count % self.capacity] = values
+        header[_COUNT] = count + 1
+        header[_SEQ] += 1
+
+    def read_since(self, since, retries=1000):
+        """Consistent copy of rows written after `since`, oldest first.
+
+        Returns (rows, count) where count is the total rows written. At most
+        one ring's worth of rows is returned if the reader fell behind.
+        """
+        header = self.header
+        for _ in range(retries):
+            start = int(header[_SEQ])
+            if start & 1:
+                time.sleep(0)
+                continue
+
+            count = int(header[_COUNT])
+            first = max(count - self.capacity, min(since, count), 0)
+            rows = self.rows[np.arange(first, count) % self.capacity]
+
+            if int(header[_SEQ]) == start:
+                return rows, count
+        raise RuntimeError("TickRing read kept racing the writer")
+
+    def snapshot(self):
+        """Consistent copy of the whole live window, oldest first."""
+        return self.read_since(0)
+
+    def close(self):
+        self.header = None
+        self.rows = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
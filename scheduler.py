@@ -0,0 +1,87 @@
+# scheduler.py
+
+import os
+
+SHARD_PREFIX = "monitor"
+
+
+class ShardScheduler:
+    """Assigns stock codes to at most `max_shards` monitor workers.
+
+    The worker count follows the watchlist up to the limit (one stock per
+    worker until every core has one), new stocks go to the least-loaded
+    worker, and removals are evened out by moving stocks so no two workers
+    differ by more than one. Only bookkeeping lives here; the server turns
+    the returned moves into process commands.
+    """
+
+    def __init__(self, max_shards=None):
+        self.max_shards = max(1, max_shards or os.cpu_count() or 1)
+        self.shards = {}  # shard name -> set of stock codes
+        self.assignment = {}  # stock code -> shard name
+
+    def __contains__(self, code):
+        return code in self.assignment
+
+    def _new_shard(self):
+        index = 0
+        while f"{SHARD_PREFIX}-{index}" in self.shards:
+            index += 1
+        name = f"{SHARD_PREFIX}-{index}"
+        self.shards[name] = set()
+        return name
+
+    def _least_loaded(self, exclude=None):
+        # Ties go to the lowest-numbered shard so placement is deterministic
+        return min(
+            (name for name in self.shards if name != exclude),
+            key=lambda name: (len(self.shards[name]), name),
+        )
+
+    def add(self, code):
+        """Place a new stock; returns its shard name."""
+        if code in self.assignment:
+            return self.assignment[code]
+        if len(self.shards) < min(self.max_shards, len(self.assignment) + 1):
+            shard = self._new_shard()
+        else:
+            shard = self._least_loaded()
+        self.shards[shard].add(code)
+        self.assignment[code] = shard
+        return shard
+
+    def remove(self, code):
+        """Forget a stock; returns the (code, from, to) moves that rebalance."""
+        shard = self.assignment.pop(code, None)
+        if shard is None:
+            return []
+        self.shards[shard].discard(code)
+        return self.rebalance()
+
+    def _move(self, code, shard):
+        source = self.assignment[code]
+        self.shards[source].discard(code)
+        self.shards[shard].add(code)
+        self.assignment[code] = shard
+        return code, source, shard
+
+    def rebalance(self):
+        moves = []
+        target = min(self.max_shards, len(self.assignment))
+
+        # Retire the emptiest workers first, handing their stocks on
+        while len(self.shards) > max(target, 1):
+            shard = self._least_loaded()
+            for code in sorted(self.shards[shard]):
+                moves.append(self._move(code, self._least_loaded(exclude=shard)))
+            del self.shards[shard]
+        if not self.assignment:
+            self.shards.clear()
+            return moves
+
+        while True:
+            busiest = max(self.shards, key=lambda name: (len(self.shards[name]), name))
+            idlest = self._least_loaded()
+            if len(self.shards[busiest]) - len(self.shards[idlest]) <= 1:
+                return moves
+            moves.append(self._move(max(self.shards[busiest]), idlest))
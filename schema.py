@@ -0,0 +1,231 @@
+# schema.py
+
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# One fixed, compact row layout for ticks and bars, shared by the collector,
+# monitors, stores, dashboard and historical loaders: int64 epoch-ns times,
+# float32 prices, int64 quantities and one-byte category codes for text.
+
+NAT = np.iinfo(np.int64).min  # pandas' NaT as int64 nanoseconds
+NAN = float("nan")
+PRICE_DECIMALS = 2  # exchange prices are quoted in paise
+PRICE_COLUMNS = ("Open", "High", "Low", "Close")
+
+
+class Category:
+    """Fixed string table stored as uint8 codes; 0 is empty/unknown.
+
+    The table is part of the schema, so every process maps a value to the
+    same code without sharing state. Values not in the table become "".
+    """
+
+    dtype = np.dtype("u1")
+
+    def __init__(self, values):
+        self.values = ("",) + tuple(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, value):
+        return self.codes.get(value or "", 0)
+
+    def decode(self, codes):
+        return pd.Categorical.from_codes(np.asarray(codes, dtype=np.int64), self.values)
+
+
+EXCHANGE = Category(
+    (
+        "NSE",
+        "BSE",
+        "NFO",
+        "BFO",
+        "NDX",
+        "MCX",
+        "NSE Equity",
+        "BSE Equity",
+        "NSE Futures & Options",
+        "BSE Futures & Options",
+    )
+)
+TREND = Category(("Up", "Down", "Neutral"))
+CATEGORIES = {"Exchange": EXCHANGE, "Trend": TREND}
+
+TICK_DTYPE = np.dtype(
+    [
+        ("Timestamp", "i8"),  # exchange time (ltt), NAT when unparsable
+        ("Open", "f4"),
+        ("High", "f4"),
+        ("Low", "f4"),
+        ("Close", "f4"),
+        ("PrevClose", "f4"),
+        ("Change", "f4"),
+        ("Volume", "i8"),  # last traded quantity
+        ("TotalVolume", "i8"),  # day's cumulative quantity, 0 if unknown
+        ("BuyQty", "i8"),
+        ("SellQty", "i8"),
+        ("BuyPrice", "f4"),
+        ("SellPrice", "f4"),
+        ("TotalBuyQty", "i8"),
+        ("TotalSellQty", "i8"),
+        ("AvgPrice", "f4"),
+        ("UpperCircuit", "f4"),
+        ("LowerCircuit", "f4"),
+        ("Exchange", "u1"),  # EXCHANGE code
+        ("Trend", "u1"),  # TREND code
+        ("ReceivedAt", "i8"),  # wall-clock epoch ns when the hub got the tick
+    ]
+)
+
+BAR_DTYPE = np.dtype(
+    [
+        ("Timestamp", "i8"),  # bar start
+        ("Open", "f4"),
+        ("High", "f4"),
+        ("Low", "f4"),
+        ("Close", "f4"),
+        ("Volume", "i8"),
+    ]
+)
+HISTORY_BAR_DTYPE = np.dtype(BAR_DTYPE.descr + [("OpenInterest", "i8")])
+LIVE_BAR_DTYPE = np.dtype(
+    BAR_DTYPE.descr + [("Ticks", "i4"), ("ReceivedAt", "i8")]  # newest tick's arrival
+)
+
+# Breeze websocket keys for each tick field
+TICK_FIELDS = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "last",
+    "PrevClose": "close",  # previous close
+    "Change": "change",
+    "Volume": "ltq",
+    "TotalVolume": "ttq",
+    "BuyQty": "bQty",
+    "SellQty": "sQty",
+    "BuyPrice": "bPrice",
+    "SellPrice": "sPrice",
+    "TotalBuyQty": "totalBuyQt",
+    "TotalSellQty": "totalSellQ",
+    "AvgPrice": "avgPrice",
+    "UpperCircuit": "upperCktLm",
+    "LowerCircuit": "lowerCktLm",
+}
+
+# Breeze historical downloads use lowercase names
+COLUMN_MAP = {
+    "datetime": "Timestamp",
+    "open": "Open",
+    "high": "High",
+    "low": "Low",
+    "close": "Close",
+    "volume": "Volume",
+    "open_interest": "OpenInterest",
+}
+
+
+@lru_cache(maxsize=4096)
+def parse_time(value):
+    # Feed times have 1s resolution, so consecutive ticks repeat the string
+    timestamp = pd.to_datetime(value, errors="coerce")
+    return NAT if pd.isna(timestamp) else timestamp.value
+
+
+def as_price(values):
+    """float32 prices -> float64 without float32 noise (2414.8, not 2414.80005)."""
+    return np.round(np.asarray(values, dtype=np.float64), PRICE_DECIMALS)
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def _int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
+_CONVERT = {
+    name: _float if TICK_DTYPE[name].kind == "f" else _int for name in TICK_FIELDS
+}
+
+
+def parse_tick(tick):
+    """Breeze websocket tick -> dict of TICK_DTYPE fields."""
+    row = {"Timestamp": parse_time(tick.get("ltt"))}
+    for name, key in TICK_FIELDS.items():
+        row[name] = _CONVERT[name](tick.get(key))
+    row["Exchange"] = EXCHANGE.encode(tick.get("exchange"))
+    row["Trend"] = TREND.encode(tick.get("trend"))
+    row["ReceivedAt"] = time.time_ns()
+    return row
+
+
+def normalize_frame(df, dtype=BAR_DTYPE, extra=False):
+    """Frame with Breeze or schema column names -> schema names and dtypes.
+
+    Missing schema columns are filled (NaN / 0 / NaT); other columns are
+    dropped unless `extra` is set.
+    """
+    df = df.rename(columns=COLUMN_MAP)
+    out = {}
+    for name in dtype.names:
+        kind = dtype[name].kind
+        if name == "Timestamp":
+            values = df[name] if name in df else pd.Series(pd.NaT, index=df.index)
+            out[name] = pd.to_datetime(values).astype("datetime64[ns]")
+        elif name not in df:
+            out[name] = np.full(len(df), NAN if kind == "f" else 0, dtype=dtype[name])
+        elif kind == "f":
+            out[name] = pd.to_numeric(df[name], errors="coerce").astype(dtype[name])
+        else:
+            values = pd.to_numeric(df[name], errors="coerce").fillna(0)
+            out[name] = values.astype(dtype[name])
+    normalized = pd.DataFrame(out, index=df.index)
+    if extra:
+        rest = [name for name in df.columns if name not in out]
+        normalized = pd.concat([normalized, df[rest]], axis=1)
+    return normalized
+
+
+def to_records(df, dtype=BAR_DTYPE):
+    """Normalized frame -> structured array (Timestamp as epoch ns)."""
+    records = np.zeros(len(df), dtype=dtype)
+    for name in dtype.names:
+        values = df[name].to_numpy()
+        if name == "Timestamp":
+            values = values.astype("datetime64[ns]").view(np.int64)
+        records[name] = values
+    return records
+
+
+def to_frame(columns, symbol=None):
+    """Columns (dict or structured array) -> DataFrame.
+
+    Timestamp becomes datetime64, category codes become pandas
+    Categoricals, and `symbol` adds a categorical Symbol column.
+    """
+    if isinstance(columns, np.ndarray):
+        columns = {name: columns[name] for name in columns.dtype.names}
+    df = pd.DataFrame(columns)
+    if "Timestamp" in df.columns and df["Timestamp"].dtype.kind == "i":
+        df["Timestamp"] = pd.to_datetime(df["Timestamp"], unit="ns")
+    for name in df.columns:
+        if name in CATEGORIES and df[name].dtype.kind == "u":
+            df[name] = CATEGORIES[name].decode(df[name])
+        elif (
+            df[name].dtype == object and len(df) and isinstance(df[name].iloc[0], bytes)
+        ):
+            # Partitions written before the compact schema kept raw text
+            df[name] = df[name].str.decode("utf-8", errors="ignore")
+    if symbol is not None:
+        df.insert(0, "Symbol", pd.Categorical([symbol.upper()] * len(df)))
+    return df
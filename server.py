@@ -1,35 +1,94 @@
 # server.py
 
+import argparse
+import os
+import queue
+import signal
 import time
-import json
-import io
-from multiprocessing import Manager, Process
+from collections import deque
+from functools import partial
+from multiprocessing import Manager, Queue
+
+import numpy as np
 import pandas as pd
 
-from indicator import is_breakout, add_indicators
-from collector import start_collector
-from telegram_alert import send_trade_alert, send_pipeline_status, send_error_alert
+from indicator import check_levels, IncrementalIndicators, INDICATOR_COLUMNS
+from collector import start_feed_hub
+from bar_builder import BarBuilder, BAR_STORE_DIR
+from alert_aggregator import ErrorAggregator, report_error
+import metrics
+from column_store import ColumnStore, STORE_DIR
+from config_service import ConfigWatcher
+from replay_feed import parse_speed, start_replay_hub
+from ring_buffer import TickRing, ring_name, start_resource_tracker
+from scheduler import ShardScheduler
+from schema import LIVE_BAR_DTYPE, NAT, PRICE_COLUMNS, TICK_DTYPE, as_price
+from supervisor import Supervisor
+from tick_store import TickStore
+from telegram_alert import flush_alerts, send_trade_alert, send_pipeline_status
 
 BREAKOUT_STATE = {}
 LAST_CONFIG = {}
 CONFIG_PATH = "config.json"
 
-
-def load_config():
-    try:
-        with open(CONFIG_PATH, "r") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"[Config Error] Failed to read config.json: {e}")
-        return {"stocks": []}
-
-
-def fetch_latest_config_for_stock(stock_code):
-    config = load_config()
-    for stock in config.get("stocks", []):
-        if stock["stock_code"] == stock_code:
-            return stock
-    return None
+# Monitor window: raw tick fields plus the indicator columns computed per tick
+WINDOW_DTYPE = np.dtype(TICK_DTYPE.descr + [(c, "f8") for c in INDICATOR_COLUMNS])
+BAR_WINDOW_DTYPE = np.dtype(
+    LIVE_BAR_DTYPE.descr + [(c, "f8") for c in INDICATOR_COLUMNS]
+)
+BAR_HISTORY = 500  # closed bars kept per stock to re-warm indicators
+NO_INDICATORS = dict.fromkeys(INDICATOR_COLUMNS, float("nan"))
+
+IDLE_WAKEUP = 2  # seconds; upper bound on how long a monitor sleeps
+CONFIG_POLL_INTERVAL = 1
+LATENCY_REPORT_INTERVAL = 60
+USAGE_REPORT_INTERVAL = 60
+MONITOR_WORKERS = os.cpu_count() or 1  # stocks are sharded across these
+FEED_HUB = "feed_hub"
+REPLAY_DIR = "replay_data"  # stores for --replay runs, kept apart from live data
+REPLAY_RINGS = "replay"  # and their shared-memory ring namespace
+RESTART = "restart"  # resume marker: the stock's last worker died mid-stream
+
+INDICATOR_TIME = metrics.histogram(
+    "indicator_update_seconds", "Incremental indicators for one tick or bar"
+)
+BREAKOUT_TIME = metrics.histogram("breakout_check_seconds", "check_levels() per row")
+STORE_WRITE = metrics.histogram("store_write_seconds", "Tick/bar ColumnStore append")
+TICK_TO_EVAL = metrics.histogram(
+    "tick_to_eval_seconds", "Hub receive -> breakout rule evaluated"
+)
+TICK_TO_ALERT = metrics.histogram(
+    "tick_to_alert_seconds", "Hub receive -> alert queued for Telegram"
+)
+ALERTS = metrics.counter("alerts_total", "Breakout/breakdown alerts", "symbol")
+TICKS_SKIPPED = metrics.counter(
+    "ticks_skipped_total", "Ticks overwritten in the ring before being read", "symbol"
+)
+RING_BACKLOG = metrics.gauge(
+    "ring_backlog_ticks", "Ticks read from the ring in the last pass", "symbol"
+)
+
+
+class LatencyStats:
+    def __init__(self, size=1000):
+        self.samples = deque(maxlen=size)
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def summary(self):
+        if not self.samples:
+            return "n/a"
+        p50, p90, p99 = np.percentile(self.samples, [50, 90, 99]) * 1000
+        return (
+            f"p50={p50:.1f}ms p90={p90:.1f}ms p99={p99:.1f}ms (n={len(self.samples)})"
+        )
+
+
+def wait_for_ticks(new_data, timeout=IDLE_WAKEUP):
+    # Sleep until the feed hub signals new ticks or a held-back stock is due
+    if new_data.wait(timeout=timeout):
+        new_data.clear()
 
 
 def print_config_changes(stock_code, new_config):
@@ -54,134 +113,638 @@ def print_config_changes(stock_code, new_config):
         print(f"[🔁 CONFIG CHANGE] {stock_code} → " + ", ".join(messages))
 
 
-def monitor_stock(shared_data, initial_config):
-    stock_code = initial_config["stock_code"]
-
-    LAST_CONFIG[stock_code] = initial_config.copy()
-    BREAKOUT_STATE[stock_code] = {"above_resistance": False, "below_support": False}
-
-    while True:
-        try:
-            updated_config = fetch_latest_config_for_stock(stock_code)
-            if not updated_config:
-                print(f"[⚠️ WARNING] {stock_code} config not found in latest config.")
-                time.sleep(2)
-                continue
-
-            support = updated_config.get("support", 0)
-            resistance = updated_config.get("resistance", 0)
-
-            if (
-                LAST_CONFIG[stock_code].get("support") != support
-                or LAST_CONFIG[stock_code].get("resistance") != resistance
-            ):
-                print_config_changes(stock_code, updated_config)
-                LAST_CONFIG[stock_code] = updated_config.copy()
-                BREAKOUT_STATE[stock_code] = {
-                    "above_resistance": False,
-                    "below_support": False,
-                }
-
-            if stock_code in shared_data:
-                df = pd.read_json(io.StringIO(shared_data[stock_code]))
-
-                if len(df) < 10:
-                    time.sleep(1)
-                    continue
-
-                df = add_indicators(df, updated_config)
-                signal, price, levels, reason = is_breakout(
-                    df, resistance, support, updated_config
+def alerted(stock_code, arrived, alert_latency):
+    latency = (time.time_ns() - arrived) / 1e9
+    alert_latency.add(latency)
+    TICK_TO_ALERT.observe(latency)
+    ALERTS.inc(1, stock_code)
+
+
+def evaluate(stock_code, row, state, support, resistance, config, arrived, stats):
+    # Breakout rule on one tick or closed bar; alerts on the first cross only
+    eval_latency, alert_latency = stats
+    with BREAKOUT_TIME.time():
+        signal, price, levels, reason = check_levels(row, resistance, support, config)
+    if price is not None:
+        price = float(as_price(price))
+    latency = (time.time_ns() - arrived) / 1e9
+    eval_latency.add(latency)
+    TICK_TO_EVAL.observe(latency)
+    timestamp = pd.Timestamp(row["Timestamp"])
+
+    if signal == "breakout" and not state["above_resistance"]:
+        msg = f"📈 Breakout Above Resistance (₹{resistance})\n🧠 Reason: {reason}"
+        print(f"[📢 ALERT] {stock_code} {msg} at ₹{price}")
+        send_trade_alert(stock_code, msg, price, timestamp)
+        alerted(stock_code, arrived, alert_latency)
+        state["above_resistance"] = True
+        state["below_support"] = False
+
+    elif signal == "breakdown" and not state["below_support"]:
+        msg = f"📉 Breakdown Below Support (₹{support})\n🧠 Reason: {reason}"
+        print(f"[📢 ALERT] {stock_code} {msg} at ₹{price}")
+        send_trade_alert(stock_code, msg, price, timestamp)
+        alerted(stock_code, arrived, alert_latency)
+        state["below_support"] = True
+        state["above_resistance"] = False
+
+
+def as_row(record):
+    # float32 prices widened like the backtest's (as_price): a tick at 2018.9
+    # must compare equal to a 2018.9 resistance, not as 2018.9000244
+    row = dict(zip(record.dtype.names, record.item()))
+    prices = as_price([row[name] for name in PRICE_COLUMNS])
+    row.update(zip(PRICE_COLUMNS, prices.tolist()))
+    return row
+
+
+def close_bar(engine, bars, bar):
+    row = as_row(bar)
+    with INDICATOR_TIME.time():
+        row.update(engine.update(row["High"], row["Low"], row["Close"]))
+    bars.append(row)
+    return row
+
+
+class StockMonitor:
+    """One watched stock inside a monitor worker.
+
+    Holds the stock's ring, indicator engine, optional bar builder and
+    latency stats; step() evaluates whatever arrived since the last call.
+    `resume` is another worker's handoff() (last ring position, breakout
+    state, newest evaluated bar), so a stock moved between workers neither
+    re-alerts nor skips ticks. With RESTART the old worker died without a
+    handoff, so the position is recovered from what it last stored. Replayed
+    stocks alert as "CODE [replay]".
+    """
+
+    def __init__(self, config, store, bar_stores, resume=None, replay=False):
+        self.stock_code = config["stock_code"]
+        self.label = f"{self.stock_code} [replay]" if replay else self.stock_code
+        self.root = REPLAY_DIR if replay else ""
+        self.ring = TickRing.attach(
+            ring_name(self.stock_code, REPLAY_RINGS if replay else "")
+        )
+        self.config = config
+        self.store = store  # shared by every stock in the worker
+        self.bar_stores = bar_stores  # bar_interval -> ColumnStore, shared too
+
+        self.engine = None
+        self.window = TickStore(WINDOW_DTYPE, capacity=self.ring.capacity)
+        self.last_seq = 0
+
+        # With "bar_interval" set, indicators and the breakout rule run once per
+        # closed bar instead of once per tick; ticks carry the latest bar's values.
+        self.builder = None
+        self.bars = TickStore(BAR_WINDOW_DTYPE, capacity=BAR_HISTORY)
+        self.last_bar = NAT  # start of the newest bar already evaluated
+
+        self.stats = (LatencyStats(), LatencyStats())  # tick→eval, tick→alert
+        self.last_report = time.time()
+        self.retry_at = 0.0  # set after an error so one stock can't stall the rest
+        self.next_step = 0.0  # with coalesce_ms, bursts wait until then
+
+        LAST_CONFIG[self.stock_code] = config.copy()
+        BREAKOUT_STATE[self.stock_code] = {
+            "above_resistance": False,
+            "below_support": False,
+        }
+        if resume == RESTART:
+            resume = self.recover()
+        if resume is not None:
+            self.last_seq, BREAKOUT_STATE[self.stock_code], self.last_bar = resume
+
+    def recover(self):
+        # Ring ticks up to the last stored one were handled already; the
+        # breakout state is re-derived from that tick's close
+        stock_code = self.stock_code
+        config = self.config
+        last = self.store.tail(stock_code, 1, ["ReceivedAt", "Close"])
+        if not last:
+            return None
+        rows, seq = self.ring.snapshot()
+        done = np.count_nonzero(rows["ReceivedAt"] <= last["ReceivedAt"][0])
+
+        signal = check_levels(
+            {"Close": float(as_price(last["Close"][0]))},
+            config.get("resistance", 0),
+            config.get("support", 0),
+            config,
+        )[0]
+        state = {
+            "above_resistance": signal == "breakout",
+            "below_support": signal == "breakdown",
+        }
+
+        last_bar = NAT
+        bar_interval = config.get("bar_interval")
+        if bar_interval:
+            if bar_interval not in self.bar_stores:
+                self.bar_stores[bar_interval] = ColumnStore(
+                    os.path.join(self.root, BAR_STORE_DIR, bar_interval)
                 )
-
-                filename = f"latest_data_{stock_code.upper()}.csv"
-                df.to_csv(filename, index=False)
-                print(
-                    f"[{df['Timestamp'].iloc[-1]}] 💾 {stock_code}: Saved {len(df)} rows to {filename}"
+            bar = self.bar_stores[bar_interval].tail(stock_code, 1, ["Timestamp"])
+            if bar:
+                last_bar = int(bar["Timestamp"][0])
+        return seq - len(rows) + done, state, last_bar
+
+    @property
+    def coalesce(self):
+        return self.config.get("coalesce_ms", 0) / 1000
+
+    def step(self):
+        stock_code = self.stock_code
+        config = self.config
+        ring = self.ring
+        window = self.window
+        bars = self.bars
+
+        support = config.get("support", 0)
+        resistance = config.get("resistance", 0)
+        bar_interval = config.get("bar_interval")
+
+        if (
+            LAST_CONFIG[stock_code].get("support") != support
+            or LAST_CONFIG[stock_code].get("resistance") != resistance
+        ):
+            print_config_changes(stock_code, config)
+            LAST_CONFIG[stock_code] = config.copy()
+            BREAKOUT_STATE[stock_code] = {
+                "above_resistance": False,
+                "below_support": False,
+            }
+
+        rows, seq = ring.read_since(self.last_seq)
+        RING_BACKLOG.set(len(rows), stock_code)
+        new_builder = False
+
+        skipped = seq - self.last_seq - ring.capacity
+        if self.engine is not None and skipped > 0:
+            # The feed outran this worker: those ticks are never evaluated
+            print(f"[⚠️ BEHIND] {stock_code}: {skipped} ticks overwritten unread")
+            TICKS_SKIPPED.inc(skipped, stock_code)
+
+        # Only new ticks go through the engine; rebuild from the whole ring
+        # when indicator settings change or we fell too far behind.
+        if (
+            self.engine is None
+            or not self.engine.matches(config)
+            or not 0 <= seq - self.last_seq <= ring.capacity
+            or (self.builder.interval if self.builder else None) != bar_interval
+        ):
+            rows, seq = ring.snapshot()
+            self.engine = IncrementalIndicators(config)
+            window.clear()
+
+            if not bar_interval:
+                self.builder = None
+            elif self.builder is None or self.builder.interval != bar_interval:
+                self.builder = BarBuilder(bar_interval)
+                new_builder = True
+                bars.clear()
+            else:
+                # Same bars, new settings: recompute from the bar history
+                history = bars.columns()
+                self.engine.update_frame(
+                    {name: as_price(history[name]) for name in PRICE_COLUMNS}
                 )
 
-                state = BREAKOUT_STATE[stock_code]
-
-                if signal == "breakout" and not state["above_resistance"]:
-                    msg = f"📈 Breakout Above Resistance (₹{resistance})\n🧠 Reason: {reason}"
-                    print(f"[📢 ALERT] {stock_code} {msg} at ₹{price}")
-                    send_trade_alert(stock_code, msg, price, df["Timestamp"].iloc[-1])
-                    state["above_resistance"] = True
-                    state["below_support"] = False
+        engine = self.engine
+        builder = self.builder
+        state = BREAKOUT_STATE[stock_code]
+        first = seq - len(rows)
+        closed = []
+
+        for i, row in enumerate(rows):
+            tick = as_row(row)
+            # Each tick is evaluated exactly once, even after a rebuild
+            replay = first + i < self.last_seq
+
+            if builder is None:
+                with INDICATOR_TIME.time():
+                    tick.update(engine.update(tick["High"], tick["Low"], tick["Close"]))
+                window.append(tick)
+                if replay or len(window) < 10:
+                    continue
+                evaluate(
+                    self.label,
+                    tick,
+                    state,
+                    support,
+                    resistance,
+                    config,
+                    tick["ReceivedAt"],
+                    self.stats,
+                )
+                continue
 
-                elif signal == "breakdown" and not state["below_support"]:
-                    msg = (
-                        f"📉 Breakdown Below Support (₹{support})\n🧠 Reason: {reason}"
+            if new_builder or not replay:
+                for bar in builder.add(
+                    tick["Timestamp"],
+                    tick["Close"],
+                    tick["TotalVolume"],
+                    tick["Volume"],
+                    tick["ReceivedAt"],
+                ):
+                    closed.append(
+                        (close_bar(engine, bars, bar), tick["ReceivedAt"], replay)
+                    )
+            tick.update(engine.last or NO_INDICATORS)
+            window.append(tick)
+
+        if builder is not None:
+            # Quiet stocks: close bars on the clock, not only on the next tick
+            for bar in builder.flush_idle():
+                closed.append((close_bar(engine, bars, bar), time.time_ns(), False))
+
+            fresh_bars = 0
+            for bar, arrived, replay in closed:
+                # A worker that served this stock before may have closed it already
+                if replay or bar["Timestamp"] <= self.last_bar:
+                    continue
+                fresh_bars += 1
+                self.last_bar = bar["Timestamp"]
+                if len(bars) >= 10:
+                    evaluate(
+                        self.label,
+                        bar,
+                        state,
+                        support,
+                        resistance,
+                        config,
+                        arrived,
+                        self.stats,
+                    )
+            if fresh_bars:
+                if bar_interval not in self.bar_stores:
+                    self.bar_stores[bar_interval] = ColumnStore(
+                        os.path.join(self.root, BAR_STORE_DIR, bar_interval)
+                    )
+                with STORE_WRITE.time():
+                    self.bar_stores[bar_interval].append(
+                        stock_code, bars.columns(fresh_bars)
                     )
-                    print(f"[📢 ALERT] {stock_code} {msg} at ₹{price}")
-                    send_trade_alert(stock_code, msg, price, df["Timestamp"].iloc[-1])
-                    state["below_support"] = True
-                    state["above_resistance"] = False
-
-            time.sleep(2)
-
-        except Exception as e:
-            error_msg = f"[{stock_code}] Monitor Error: {type(e).__name__}: {e}"
-            print(f"[TELEGRAM DEBUG] Sending Error: {error_msg}")
-            send_error_alert(error_msg)
-            time.sleep(5)
-
 
-def run():
+        # Persist only ticks not stored before (a rebuild replays old ones)
+        fresh = min(seq - max(first, self.last_seq), len(window))
+        self.last_seq = seq
+
+        if fresh > 0:
+            with STORE_WRITE.time():
+                self.store.append(stock_code, window.columns(fresh))
+            print(
+                f"[{pd.Timestamp(window.last('Timestamp'))}] 💾 {stock_code}: "
+                f"Appended {fresh} rows to {self.store.root}/{stock_code.upper()}"
+            )
+
+        if time.time() - self.last_report >= LATENCY_REPORT_INTERVAL:
+            self.last_report = time.time()
+            print(
+                f"[⏱ LATENCY] {stock_code} tick→eval {self.stats[0].summary()}"
+                f" | tick→alert {self.stats[1].summary()}"
+            )
+
+    def handoff(self):
+        return self.last_seq, BREAKOUT_STATE[self.stock_code], self.last_bar
+
+    def close(self):
+        # Another worker may take the stock over and append to the same files
+        self.store.release(self.stock_code)
+        for bar_store in self.bar_stores.values():
+            bar_store.release(self.stock_code)
+        self.ring.close()
+        RING_BACKLOG.remove(self.stock_code)
+        LAST_CONFIG.pop(self.stock_code, None)
+        BREAKOUT_STATE.pop(self.stock_code, None)
+
+
+def monitor_worker(name, commands, new_data, errors, released, replay=False):
+    """Event loop serving one shard of the watchlist.
+
+    The server sends ("add", code, config, resume), ("update", code, config),
+    ("remove", code) and ("release", code) on `commands`; a released stock's
+    handoff() goes back on `released` for the worker taking it over. The
+    feed hub sets `new_data` for any of the shard's stocks. None stops it.
+    """
+    monitors = {}  # stock_code -> StockMonitor
+    store = ColumnStore(os.path.join(REPLAY_DIR, STORE_DIR) if replay else STORE_DIR)
+    bar_stores = {}
+    running = True
+    metrics.start(name)
+    print(f"🟢 {name} started")
+
+    # Multiprocessing ends a worker with os._exit, so the dispatcher's atexit
+    # flush never runs here: send alerts still in the batch window ourselves
+    try:
+        while running:
+            while True:
+                try:
+                    command = commands.get_nowait()
+                except queue.Empty:
+                    break
+                if command is None:
+                    # Shutdown or retired by a rebalance
+                    running = False
+                    break
+
+                action, code, *details = command
+                try:
+                    if action == "add" and code not in monitors:
+                        config, resume = details
+                        monitors[code] = StockMonitor(
+                            config, store, bar_stores, resume, replay
+                        )
+                        print(f"[➕ ASSIGNED] {code} → {name}")
+                    elif action == "update" and code in monitors:
+                        monitors[code].config = details[0]
+                    elif action in ("remove", "release") and code in monitors:
+                        monitor = monitors.pop(code)
+                        if action == "release":
+                            released.put((code, monitor.handoff()))
+                        monitor.close()
+                except Exception as e:
+                    print(f"[{code}] Monitor Error: {type(e).__name__}: {e}")
+                    report_error(errors, code, e)
+
+            if not running:
+                break
+
+            # Each stock's coalesce_ms only holds back that stock: it is stepped
+            # at most once per window, the rest as soon as ticks arrive
+            timeout = IDLE_WAKEUP
+            for code, monitor in monitors.items():
+                now = time.time()
+                if now < monitor.retry_at:
+                    continue
+                if now < monitor.next_step:
+                    if monitor.ring.count > monitor.last_seq:
+                        timeout = min(timeout, monitor.next_step - now)
+                    continue
+                try:
+                    monitor.step()
+                    monitor.next_step = now + monitor.coalesce
+                except Exception as e:
+                    print(f"[{code}] Monitor Error: {type(e).__name__}: {e}")
+                    # The server dedupes these across stocks before alerting
+                    report_error(errors, code, e)
+                    monitor.retry_at = time.time() + 5
+
+            wait_for_ticks(new_data, timeout)
+
+        for monitor in monitors.values():
+            monitor.close()
+        store.close()
+        for bar_store in bar_stores.values():
+            bar_store.close()
+        metrics.dump()
+        print(f"[⏹ STOPPED] {name} exited ({len(monitors)} stocks)")
+    finally:
+        flush_alerts()
+
+
+def stop_on_sigterm(signum, frame):
+    raise KeyboardInterrupt
+
+
+def report_workers(supervisor, scheduler):
+    for row in supervisor.usage():
+        rss = "n/a" if row["rss_mb"] is None else f"{row['rss_mb']:.0f}MB"
+        cpu = "n/a" if row["cpu_pct"] is None else f"{row['cpu_pct']:.1f}%"
+        stocks = scheduler.shards.get(row["name"])
+        load = "" if stocks is None else f" stocks={len(stocks)}"
+        print(
+            f"[📊 WORKER] {row['name']} pid={row['pid']} rss={rss} cpu={cpu}"
+            f"{load} restarts={row['restarts']} up={row['uptime'] / 60:.0f}m"
+        )
+
+
+def run(replay=None):
+    """Monitor config.json's stocks; `replay` is (speed, ticks_per_bar) to
+    feed them from the history CSVs instead of the Breeze websocket."""
+    start_resource_tracker()
+    namespace = "" if replay is None else REPLAY_RINGS
+    signal.signal(signal.SIGTERM, stop_on_sigterm)
+    metrics.serve()
     manager = Manager()
-    shared_data = manager.dict()
-    processes = {}
-
-    print("🚀 Real-Time Stock Monitor started. Watching for changes...")
+    watcher = ConfigWatcher(CONFIG_PATH)
+    scheduler = ShardScheduler(MONITOR_WORKERS)
+    supervisor = Supervisor(max_workers=scheduler.max_shards + 1)
+    rings = {}
+    subscribed = set()
+    last_usage_report = time.time()
+
+    # Per monitor worker: command queue and the Event the hub sets for its
+    # stocks. Stocks being moved wait in `moving` (code -> (from, to)) until
+    # the old worker hands back their position on `released`.
+    commands = {}
+    shard_events = {}
+    moving = {}
+    started = set()  # workers started before: a new start is a restart
+    released = Queue()
+
+    # Monitors report errors here; the aggregator turns storms into digests
+    errors = Queue()
+    aggregator = ErrorAggregator()
+
+    # One websocket/session for the whole watchlist; symbols come and go
+    # through subscribe/unsubscribe commands. A restarted hub gets a fresh
+    # command queue that replays every current subscription.
+    hub = {"commands": None}
+
+    def hub_args():
+        hub["commands"] = Queue()
+        for code in subscribed:
+            event = shard_events[scheduler.assignment[code]]
+            hub["commands"].put(("subscribe", code, event))
+        return (hub["commands"],)
+
+    def worker_args(shard):
+        # A (re)started worker gets a fresh queue holding its current stocks;
+        # after a crash they carry on from the ring's end, not its start
+        resume = RESTART if shard in started else None
+        started.add(shard)
+        commands[shard] = Queue()
+        for code in scheduler.shards.get(shard, ()):
+            if code not in moving:
+                commands[shard].put(("add", code, watcher.get(code), resume))
+        return (
+            shard,
+            commands[shard],
+            shard_events[shard],
+            errors,
+            released,
+            replay is not None,
+        )
+
+    def stop_worker(shard):
+        commands[shard].put(None)
+        shard_events[shard].set()
+
+    def send(code, *command):
+        shard = scheduler.assignment[code]
+        if shard in commands:  # not started yet: worker_args() will add it
+            commands[shard].put(command)
+            shard_events[shard].set()
+
+    def sync_workers():
+        # Start workers the scheduler added, retire the ones it dropped
+        for shard in scheduler.shards:
+            if shard not in supervisor:
+                shard_events[shard] = manager.Event()
+                supervisor.add(
+                    shard,
+                    monitor_worker,
+                    lambda shard=shard: worker_args(shard),
+                    stop=lambda shard=shard: stop_worker(shard),
+                )
+        for shard in list(shard_events):
+            if shard not in scheduler.shards:
+                supervisor.remove(shard)
+                del shard_events[shard]
+                commands.pop(shard, None)
+                started.discard(shard)
+
+    def move(code, source, target):
+        print(f"[🔀 REBALANCE] {code}: {source} → {target}")
+        moving[code] = (source, target)
+        hub["commands"].put(("subscribe", code, shard_events[target]))
+        if source in commands:
+            commands[source].put(("release", code))
+            shard_events[source].set()
+
+    if replay is None:
+        supervisor.add(FEED_HUB, start_feed_hub, hub_args)
+    else:
+        speed, ticks_per_bar = replay
+        print(
+            f"[⏩ REPLAY] {'max' if not speed else f'{speed:g}x'} speed,"
+            f" {ticks_per_bar} tick(s) per bar; stores under {REPLAY_DIR}/"
+        )
+        feed = partial(
+            start_replay_hub,
+            speed=speed,
+            ticks_per_bar=ticks_per_bar,
+            namespace=namespace,
+        )
+        supervisor.add(FEED_HUB, feed, hub_args)
+    supervisor.reconcile()
+
+    print(
+        f"🚀 Real-Time Stock Monitor started ({scheduler.max_shards} monitor workers"
+        " max). Watching for changes..."
+    )
 
     while True:
         try:
-            config = load_config()
-            stock_list = config.get("stocks", [])
-            existing_codes = set(processes.keys())
-
-            for stock in stock_list:
-                code = stock["stock_code"]
-                if code not in existing_codes:
-                    print(f"[🆕 NEW STOCK] {code} added — starting pipeline...")
-
-                    # Start collector
-                    collector_proc = Process(
-                        target=start_collector, args=(shared_data, code)
+            for event, name, *details in supervisor.reconcile():
+                if event == "exited":
+                    exitcode, delay = details
+                    print(
+                        f"[♻️ RESTART] {name} exited ({exitcode}); restarting in {delay:.0f}s"
                     )
-                    collector_proc.start()
-
-                    # Start monitor
-                    monitor_proc = Process(
-                        target=monitor_stock, args=(shared_data, stock)
+                    aggregator.report(
+                        "WorkerExit",
+                        f"process exited with code {exitcode}",
+                        None if name == FEED_HUB else name,
                     )
-                    monitor_proc.start()
+                elif event == "waiting":
+                    print(
+                        f"[⏸ WAITING] {name}: worker limit ({supervisor.max_workers}) reached"
+                    )
+                elif event == "stopped":
+                    print(f"[⏹ STOPPED] {name} (exit code {details[0]})")
+
+                if event in ("exited", "stopped"):
+                    # Stocks it was handing over won't be released
+                    for code, (source, target) in list(moving.items()):
+                        if source == name:
+                            del moving[code]
+                            send(code, "add", code, watcher.get(code), RESTART)
+
+            # Moved stocks resume on their new worker where the old one stopped
+            while True:
+                try:
+                    code, resume = released.get_nowait()
+                except queue.Empty:
+                    break
+                if moving.pop(code, None) is not None:
+                    send(code, "add", code, watcher.get(code), resume)
+
+            digest = aggregator.drain(errors)
+            if digest:
+                print(f"[🔁 ERROR DIGEST] {aggregator.stats()}")
+
+            if time.time() - last_usage_report >= USAGE_REPORT_INTERVAL:
+                last_usage_report = time.time()
+                report_workers(supervisor, scheduler)
+
+            changes = watcher.poll()
+            if changes is None:
+                time.sleep(CONFIG_POLL_INTERVAL)
+                continue
 
-                    # Track them
-                    processes[code] = {
-                        "collector": collector_proc,
-                        "monitor": monitor_proc,
-                    }
+            added, updated, removed = changes
 
-                    LAST_CONFIG[code] = stock.copy()
-                    BREAKOUT_STATE[code] = {
-                        "above_resistance": False,
-                        "below_support": False,
-                    }
+            for code in removed:
+                print(f"[➖ REMOVED STOCK] {code} — stopping pipeline...")
+                hub["commands"].put(("unsubscribe", code, None))
+                subscribed.discard(code)
+                if moving.pop(code, None) is None:
+                    send(code, "remove", code)
+                for code_moved, source, target in scheduler.remove(code):
+                    move(code_moved, source, target)
+                # Unlinks the name; processes still attached keep their mapping
+                rings.pop(code).close()
+                send_pipeline_status("⏹ Stopped Monitoring", code)
 
-                    send_pipeline_status("✅ Started Monitoring", code)
+            for code in added:
+                print(f"[🆕 NEW STOCK] {code} added — starting pipeline...")
 
-            time.sleep(5)
+                # Tick ring shared by the feed hub (writer) and monitor (reader)
+                rings[code] = TickRing.create(ring_name(code, namespace))
+                shard = scheduler.add(code)
+                sync_workers()
+                send(code, "add", code, watcher.get(code), None)
+
+                hub["commands"].put(("subscribe", code, shard_events[shard]))
+                subscribed.add(code)
+                send_pipeline_status("✅ Started Monitoring", code)
+
+            for code in updated:
+                if code not in moving:
+                    send(code, "update", code, watcher.get(code))
+
+            # Retire workers a removal left idle (after their stocks were released)
+            sync_workers()
 
         except KeyboardInterrupt:
             print("⛔️ Stopped by user.")
             break
         except Exception as e:
-            error_msg = f"[Server Error] {type(e).__name__}: {e}"
-            print(f"[TELEGRAM DEBUG] Sending Error: {error_msg}")
-            send_error_alert(error_msg)
+            print(f"[Server Error] {type(e).__name__}: {e}")
+            aggregator.report(type(e).__name__, str(e))
             time.sleep(5)
 
+    # Workers flush their stores and exit on their own; the hub is terminated
+    supervisor.shutdown()
+    for ring in rings.values():
+        ring.close()
+    aggregator.flush(force=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Real-time breakout monitor")
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="feed stocksinfo/stock_csv history instead of the live websocket",
+    )
+    parser.add_argument("--speed", default="1", help="replay speed: 1, 10, 100 or max")
+    parser.add_argument("--ticks-per-bar", type=int, choices=(1, 4), default=1)
+    args = parser.parse_args()
+
+    run((parse_speed(args.speed), args.ticks_per_bar) if args.replay else None)
+
 
 if __name__ == "__main__":
-    run()
+    main()
@@ -0,0 +1,222 @@
+# supervisor.py
+
+import os
+import signal
+import time
+from multiprocessing import Process
+
+MAX_WORKERS = 64
+RESTART_BACKOFF = 1  # seconds before the first restart, doubled per crash
+MAX_BACKOFF = 60
+STABLE_AFTER = 60  # seconds up before a worker's crash count resets
+STOP_TIMEOUT = 5  # seconds a worker gets to exit on its own before SIGTERM
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _run_worker(target, args):
+    # Ctrl+C reaches the whole process group; the supervisor decides when
+    # workers stop, so they ignore it and exit through their stop signal.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    target(*args)
+
+
+def process_usage(pid):
+    """(rss bytes, cpu seconds) of a process from /proc; None elsewhere."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    # fields[0] is /proc stat field 3 (state); utime/stime are fields 14/15
+    cpu = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+    return rss_pages * _PAGE_SIZE, cpu
+
+
+class Worker:
+    def __init__(self, name, target, args, stop):
+        self.name = name
+        self.target = target
+        self.args = args  # tuple, or a callable returning one for each (re)start
+        self.stop = stop  # asks the process to exit by itself; None -> SIGTERM
+        self.process = None
+        self.started_at = None
+        self.starts = 0
+        self.failures = 0  # consecutive crashes, drives the backoff
+        self.retry_at = 0.0
+        self.waiting = False
+        self.cpu_sample = None  # (clock, cpu seconds) at the last usage() call
+
+
+class Supervisor:
+    """Keeps a bounded set of named worker processes running.
+
+    add() and remove() change the desired set; reconcile(), called from the
+    server loop, starts missing workers (at most max_workers at a time),
+    restarts ones that died with exponential backoff, and finishes stops.
+    A removed worker first gets its stop callback, then SIGTERM after
+    stop_timeout, then SIGKILL. Every call returns at once.
+    """
+
+    def __init__(
+        self,
+        max_workers=MAX_WORKERS,
+        backoff=RESTART_BACKOFF,
+        max_backoff=MAX_BACKOFF,
+        stop_timeout=STOP_TIMEOUT,
+        clock=time.monotonic,
+    ):
+        self.max_workers = max_workers
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.stop_timeout = stop_timeout
+        self.clock = clock
+        self.workers = {}  # name -> Worker, started in insertion order
+        self.stopping = {}  # name -> (process, deadline, terminated yet)
+
+    def __contains__(self, name):
+        return name in self.workers
+
+    def add(self, name, target, args=(), stop=None):
+        if name in self.workers:
+            return False
+        self.workers[name] = Worker(name, target, args, stop)
+        return True
+
+    def remove(self, name):
+        worker = self.workers.pop(name, None)
+        if worker is None:
+            return False
+        process = worker.process
+        if process is not None and process.is_alive():
+            if worker.stop is not None:
+                worker.stop()
+                deadline = self.clock() + self.stop_timeout
+            else:
+                deadline = self.clock()
+            self.stopping[name] = (process, deadline, False)
+        return True
+
+    def running(self):
+        return sum(
+            1
+            for w in self.workers.values()
+            if w.process is not None and w.process.is_alive()
+        ) + len(self.stopping)
+
+    def _start(self, worker):
+        args = worker.args() if callable(worker.args) else worker.args
+        worker.process = Process(
+            target=_run_worker,
+            args=(worker.target, args),
+            name=worker.name,
+            daemon=True,  # never outlive the server
+        )
+        worker.process.start()
+        worker.started_at = self.clock()
+        worker.starts += 1
+        worker.cpu_sample = None
+
+    def _finish_stops(self, now, events):
+        for name, (process, deadline, terminated) in list(self.stopping.items()):
+            if not process.is_alive():
+                process.join()
+                del self.stopping[name]
+                events.append(("stopped", name, process.exitcode))
+            elif now >= deadline and not terminated:
+                process.terminate()
+                self.stopping[name] = (process, now + self.stop_timeout, True)
+            elif now >= deadline:
+                process.kill()
+
+    def reconcile(self):
+        """One supervision pass; returns a list of (event, name, ...) tuples.
+
+        ("started", name), ("exited", name, exitcode, restart_delay),
+        ("waiting", name) when max_workers is reached, ("stopped", name, exitcode).
+        """
+        now = self.clock()
+        events = []
+        self._finish_stops(now, events)
+        running = self.running()
+
+        for worker in self.workers.values():
+            process = worker.process
+            if process is not None:
+                if process.is_alive():
+                    if worker.failures and now - worker.started_at >= STABLE_AFTER:
+                        worker.failures = 0
+                    continue
+                process.join()
+                worker.process = None
+                worker.failures += 1
+                delay = min(self.backoff * 2 ** (worker.failures - 1), self.max_backoff)
+                worker.retry_at = now + delay
+                events.append(("exited", worker.name, process.exitcode, delay))
+
+            # A replacement never overlaps a process that is still stopping
+            if now < worker.retry_at or worker.name in self.stopping:
+                continue
+            if running >= self.max_workers:
+                if not worker.waiting:
+                    worker.waiting = True
+                    events.append(("waiting", worker.name))
+                continue
+
+            worker.waiting = False
+            self._start(worker)
+            running += 1
+            events.append(("started", worker.name))
+        return events
+
+    def usage(self):
+        """Per-worker pid, RSS (MB), CPU % since the last call, restarts, uptime."""
+        now = self.clock()
+        rows = []
+        for worker in self.workers.values():
+            process = worker.process
+            if process is None or not process.is_alive():
+                continue
+            sample = process_usage(process.pid)
+            rss_mb = cpu_pct = None
+            if sample is not None:
+                rss, cpu = sample
+                rss_mb = rss / 2**20
+                last = worker.cpu_sample or (worker.started_at, 0.0)
+                if now > last[0]:
+                    cpu_pct = 100 * (cpu - last[1]) / (now - last[0])
+                worker.cpu_sample = (now, cpu)
+            rows.append(
+                {
+                    "name": worker.name,
+                    "pid": process.pid,
+                    "rss_mb": rss_mb,
+                    "cpu_pct": cpu_pct,
+                    "restarts": worker.starts - 1,
+                    "uptime": now - worker.started_at,
+                }
+            )
+        return rows
+
+    def shutdown(self, timeout=STOP_TIMEOUT):
+        """Stop every worker now: stop callbacks, then SIGTERM, then SIGKILL."""
+        for name in list(self.workers):
+            self.remove(name)
+        for process, stop_by, _ in self.stopping.values():
+            if stop_by <= self.clock():  # no stop callback: nothing to wait for
+                process.terminate()
+
+        deadline = time.monotonic() + timeout
+        for process, _, _ in self.stopping.values():
+            process.join(max(deadline - time.monotonic(), 0))
+            if process.is_alive():
+                process.terminate()
+                process.join(1)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self.stopping.clear()
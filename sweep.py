@@ -0,0 +1,188 @@
+# sweep.py
+#
+# Grid/random parameter sweep of the breakout rule over historical minute bars:
+#   python sweep.py [STOCK_CODE ...] [--grid grid.json] [--random N]
+#                   [--confirm bb,adx] [--workers N] [--out sweep]
+
+import argparse
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import backtest_stock
+from history import available_codes, load_minute_bars
+from indicator import add_indicators
+
+# Dotted keys map onto config.json's nested stock entries. Support and
+# resistance are given as % below/above each stock's opening price so one
+# grid works for every symbol.
+DEFAULT_GRID = {
+    "resistance_pct": [0.25, 0.5, 0.75, 1.0, 1.5],
+    "support_pct": [0.25, 0.5, 0.75, 1.0, 1.5],
+    "bollinger.period": [14, 20],
+    "bollinger.std_dev": [1.5, 2.0],
+    "macd.fast_period": [12],
+    "macd.slow_period": [26],
+    "macd.signal_period": [9],
+    "adx.period": [14],
+    "adx.threshold": [20, 25, 30],
+    "moving_averages.ma_fast": [5, 9],
+    "moving_averages.ma_slow": [20, 21],
+}
+
+# Keys that don't change any indicator series; combos differing only in
+# these share one cached indicator frame.
+LEVEL_KEYS = ("resistance_pct", "support_pct", "adx.threshold")
+
+PRICE_FIELDS = ("Open", "High", "Low", "Close")
+
+_PRICES = {}  # worker-side: stock_code -> (timestamps, {field: array view})
+_SEGMENTS = []
+
+
+def expand_grid(grid, samples=None, seed=0):
+    keys = list(grid)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+    if samples is not None and samples < len(combos):
+        combos = random.Random(seed).sample(combos, samples)
+    return combos
+
+
+def build_config(combo):
+    config = {}
+    for key, value in combo.items():
+        if "." in key:
+            section, name = key.split(".", 1)
+            config.setdefault(section, {})[name] = value
+    return config
+
+
+# === Shared price arrays ===
+# The parent copies each stock's OHLC into one shared-memory block; workers
+# attach once in their initializer, so tasks only carry parameters.
+
+
+def share_prices(codes):
+    segments, meta = [], {}
+    for code in codes:
+        df = load_minute_bars(code)
+        data = df[list(PRICE_FIELDS)].to_numpy(dtype=float).T.copy()
+        shm = shared_memory.SharedMemory(create=True, size=data.nbytes)
+        np.ndarray(data.shape, dtype=float, buffer=shm.buf)[:] = data
+        segments.append(shm)
+        meta[code] = (shm.name, data.shape, df["Timestamp"].to_numpy())
+    return segments, meta
+
+
+def _init_worker(meta):
+    for code, (name, shape, timestamps) in meta.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _SEGMENTS.append(shm)
+        data = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        _PRICES[code] = (timestamps, dict(zip(PRICE_FIELDS, data)))
+
+
+@lru_cache(maxsize=128)
+def _indicator_frame(code, indicator_key):
+    timestamps, prices = _PRICES[code]
+    df = pd.DataFrame({"Timestamp": timestamps, **prices})
+    return add_indicators(df, json.loads(indicator_key))
+
+
+def _evaluate(code, indicator_key, combos, breakdowns, confirm):
+    df = _indicator_frame(code, indicator_key)
+    opening = df["Open"].iloc[0]
+
+    results = []
+    for combo in combos:
+        config = build_config(combo)
+        resistance = opening * (1 + combo["resistance_pct"] / 100)
+        support = opening * (1 - combo["support_pct"] / 100)
+        _, summary = backtest_stock(
+            df, resistance, support, breakdowns, confirm, config, with_trades=False
+        )
+        results.append(
+            {"Stock": code, **combo, "Resistance": resistance, "Support": support, **summary}
+        )
+    return results
+
+
+def run_sweep(codes, combos, breakdowns=False, confirm=(), workers=None):
+    # One task per (stock, indicator settings); each evaluates every
+    # support/resistance/threshold combo against the same cached frame.
+    groups = {}
+    for combo in combos:
+        indicator_combo = {k: v for k, v in combo.items() if k not in LEVEL_KEYS}
+        key = json.dumps(build_config(indicator_combo), sort_keys=True)
+        groups.setdefault(key, []).append(combo)
+
+    segments, meta = share_prices(codes)
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(meta,)
+        ) as pool:
+            futures = [
+                pool.submit(_evaluate, code, key, group, breakdowns, confirm)
+                for code in codes
+                for key, group in groups.items()
+            ]
+            rows = [row for future in futures for row in future.result()]
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+
+    return pd.DataFrame(rows)
+
+
+def rank_results(results, metric="TotalReturnPct"):
+    ranked = results.sort_values(["Stock", metric], ascending=[True, False])
+    ranked.insert(1, "Rank", ranked.groupby("Stock").cumcount() + 1)
+    return ranked.reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep breakout/indicator settings")
+    parser.add_argument("codes", nargs="*", help="stock codes (default: all)")
+    parser.add_argument("--grid", help="JSON file mapping parameter -> list of values")
+    parser.add_argument("--random", type=int, help="evaluate N random combinations")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--breakdowns", action="store_true")
+    parser.add_argument("--confirm", default="bb,adx,ma")
+    parser.add_argument("--metric", default="TotalReturnPct")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="sweep", help="output folder")
+    args = parser.parse_args()
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid, "r") as f:
+            grid = {**DEFAULT_GRID, **json.load(f)}
+
+    codes = args.codes or available_codes()
+    combos = expand_grid(grid, args.random, args.seed)
+    confirm = tuple(c for c in args.confirm.split(",") if c)
+
+    print(f"[*] {len(combos)} combinations x {len(codes)} stocks...")
+    results = rank_results(
+        run_sweep(codes, combos, args.breakdowns, confirm, args.workers), args.metric
+    )
+
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, "results.csv")
+    results.to_csv(path, index=False)
+
+    best = results[results["Rank"] == 1]
+    print(best.to_string(index=False))
+    print(f"[✓] {len(results)} results saved to {path}")
+
+
+if __name__ == "__main__":
+    main()
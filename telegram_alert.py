@@ -2,7 +2,12 @@
 import logging
 import os
 import asyncio
+import atexit
+import queue
+import threading
+import time
 from telegram import ForceReply, Update
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -12,11 +17,24 @@ from telegram.ext import (
 )
 from dotenv import load_dotenv
 
+import metrics
+
 load_dotenv()
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
+QUEUE_SIZE = 1000  # pending messages before new ones are dropped
+BATCH_WINDOW = 1.0  # seconds; alerts raised in the same second go out together
+MAX_MESSAGE_LEN = 4096  # Telegram's limit per message
+MAX_RETRIES = 5
+
+ALERT_QUEUE = metrics.gauge("alert_queue_depth", "Telegram messages waiting to be sent")
+ALERT_SEND = metrics.histogram(
+    "alert_send_seconds", "One Telegram send, retries included"
+)
+ALERTS_DROPPED = metrics.counter("alerts_dropped_total", "Messages dropped, queue full")
+
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
 )
@@ -39,34 +57,166 @@ async def echo(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     await update.message.reply_text(update.message.text)
 
 
-async def send_telegram_message(message: str):
-    if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
-        logger.error("Telegram credentials missing.")
-        return
-    try:
-        from telegram import Bot
-
-        bot = Bot(token=TELEGRAM_BOT_TOKEN)
-        await bot.send_message(
-            chat_id=TELEGRAM_CHAT_ID, text=message, parse_mode="Markdown"
-        )
-    except Exception as e:
-        logger.error(f"Telegram error: {e}")
+def _split(message):
+    # Cut oversized messages at line breaks: no Markdown entity in these
+    # alerts spans lines, so every part still parses (see send_error_alert)
+    parts = []
+    for line in message.split("\n"):
+        line = line[:MAX_MESSAGE_LEN]
+        if parts and len(parts[-1]) + len(line) + 1 <= MAX_MESSAGE_LEN:
+            parts[-1] += "\n" + line
+        else:
+            parts.append(line)
+    return parts
+
+
+def _seconds(retry_after):
+    # python-telegram-bot >= 22.2 may report a timedelta instead of an int
+    return getattr(retry_after, "total_seconds", lambda: retry_after)()
+
+
+class AlertDispatcher:
+    """Background sender with one event loop and one Bot for the process.
+
+    send() only puts the message on a bounded queue, so callers never wait
+    on the network. The worker thread merges messages raised within the
+    same second into one Telegram message and retries on flood control
+    (RetryAfter) and network errors; rejected messages (BadRequest,
+    Forbidden) are logged and dropped, since resending can't fix them.
+    """
+
+    def __init__(self, token=None, chat_id=None, maxsize=QUEUE_SIZE):
+        self.token = token or TELEGRAM_BOT_TOKEN
+        self.chat_id = chat_id or TELEGRAM_CHAT_ID
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def send(self, message: str) -> bool:
+        parts = [message] if len(message) <= MAX_MESSAGE_LEN else _split(message)
+        for part in parts:
+            try:
+                self.queue.put_nowait((time.time(), part))
+            except queue.Full:
+                self.dropped += 1
+                ALERTS_DROPPED.inc()
+                if self.dropped % 100 == 1:
+                    logger.warning(f"Telegram queue full, dropped {self.dropped} messages so far")
+                return False
+        ALERT_QUEUE.set(self.queue.qsize())
+        return True
+
+    def flush(self, timeout=10):
+        # Wait until everything queued so far has been handled
+        deadline = time.time() + timeout
+        while self.queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.05)
+        return not self.queue.unfinished_tasks
+
+    def _next_batch(self, first=None):
+        # Returns (messages to send now, message that didn't fit or None)
+        created, message = first or self.queue.get()
+        batch = [message]
+        size = len(message)
+        deadline = created + BATCH_WINDOW
+        while True:
+            try:
+                item = self.queue.get(timeout=max(deadline - time.time(), 0))
+            except queue.Empty:
+                return batch, None
+            if size + len(item[1]) + 1 > MAX_MESSAGE_LEN:
+                return batch, item
+            batch.append(item[1])
+            size += len(item[1]) + 1
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        bot = None
+        if self.token and self.chat_id:
+            from telegram import Bot
+
+            # One Bot (and its pooled HTTP client) reused for every message
+            bot = Bot(token=self.token)
+
+        carry = None
+        while True:
+            batch, carry = self._next_batch(carry)
+            if bot is None:
+                logger.error("Telegram credentials missing.")
+            else:
+                with ALERT_SEND.time():
+                    loop.run_until_complete(self._deliver(bot, "\n".join(batch)))
+            for _ in batch:
+                self.queue.task_done()
+            ALERT_QUEUE.set(self.queue.qsize())
+
+    async def _deliver(self, bot, text):
+        for attempt in range(MAX_RETRIES):
+            try:
+                await bot.send_message(
+                    chat_id=self.chat_id, text=text, parse_mode="Markdown"
+                )
+                self.sent += 1
+                return
+            except RetryAfter as e:
+                wait = _seconds(e.retry_after)
+                logger.warning(f"Telegram flood control, retrying in {wait}s")
+                await asyncio.sleep(wait)
+            except (BadRequest, Forbidden) as e:
+                # Permanent (BadRequest subclasses NetworkError): drop the batch
+                logger.error(f"Telegram rejected message ({e}), dropped")
+                break
+            except NetworkError as e:
+                logger.warning(f"Telegram network error ({e}), retry {attempt + 1}")
+                await asyncio.sleep(2**attempt)
+            except Exception as e:
+                logger.error(f"Telegram error: {e}")
+                break
+        self.failed += 1
+
+
+_dispatcher = None
+_dispatcher_pid = None
+
+
+def get_dispatcher() -> AlertDispatcher:
+    # Monitors are forked processes; each needs its own thread and loop
+    global _dispatcher, _dispatcher_pid
+    if _dispatcher is None or _dispatcher_pid != os.getpid():
+        _dispatcher = AlertDispatcher()
+        _dispatcher_pid = os.getpid()
+        # Give queued alerts a chance to go out on a normal exit. Forked
+        # workers leave through os._exit and skip atexit: see flush_alerts()
+        atexit.register(_dispatcher.flush, 5)
+    return _dispatcher
+
+
+def flush_alerts(timeout=5):
+    # Send what this process still has queued; no-op if it never alerted
+    if _dispatcher is not None and _dispatcher_pid == os.getpid():
+        return _dispatcher.flush(timeout)
+    return True
 
 
 def send_trade_alert(symbol: str, action: str, price: float, date: str):
     message = f"\n*ALERT: {action} Signal*\nSymbol: `{symbol}`\nPrice: `{price}`\nDate: `{date}`"
-    asyncio.run(send_telegram_message(message))
+    get_dispatcher().send(message)
 
 
 def send_pipeline_status(status: str, symbol: str):
     message = f"\n*Pipeline {status}* for `{symbol}`"
-    asyncio.run(send_telegram_message(message))
+    get_dispatcher().send(message)
 
 
 def send_error_alert(error: str):
+    # Truncated so the code block is never split across messages
+    error = error[: MAX_MESSAGE_LEN - 32]
     message = f"\n*ERROR Occurred:*\n```{error}```"
-    asyncio.run(send_telegram_message(message))
+    get_dispatcher().send(message)
 
 
 def main():
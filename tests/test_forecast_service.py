@@ -0,0 +1,101 @@
+# tests/test_forecast_service.py
+
+import os
+import time
+
+import pandas as pd
+
+# groq_forecast builds its Groq client on import; StubClient replaces it
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+from forecast_cache import ForecastCache
+from forecast_service import ForecastService, StubClient
+from ratelimit import TokenBucket
+
+
+def rows(n=20):
+    return pd.DataFrame({"Close": [100.0 + i for i in range(n)], "Volume": [10] * n})
+
+
+def fast_limiter():
+    return TokenBucket(rate=1000, capacity=100)
+
+
+def wait_idle(service, symbols, timeout=5):
+    # Idle twice in a row: a finished job resubmits its follow-up right after
+    deadline = time.time() + timeout
+    idle = 0
+    while idle < 2 and time.time() < deadline:
+        idle = 0 if any(service.busy(s) for s in symbols) else idle + 1
+        time.sleep(0.05)
+    assert idle == 2
+
+
+def test_concurrent_submits_for_same_rows_make_one_call(tmp_path):
+    client = StubClient(delay=0.2)
+    cache = ForecastCache(path=str(tmp_path / "cache.json"))
+    service = ForecastService(client, limiter=fast_limiter(), save=False, cache=cache)
+    df = rows()
+
+    accepted = [service.submit("TCS", df) for _ in range(10)]
+    wait_idle(service, ["TCS"])
+
+    # One call; the single coalesced follow-up is answered from the cache
+    assert accepted.count(True) == 1
+    assert service.coalesced == 9
+    assert client.calls == 1
+    assert service.latest("TCS").status == "done"
+    service.shutdown()
+
+
+def test_submits_while_in_flight_collapse_into_one_follow_up():
+    client = StubClient(delay=0.2)
+    service = ForecastService(client, limiter=fast_limiter(), save=False)
+
+    for i in range(5):
+        service.submit("TCS", rows(20 + i))
+    wait_idle(service, ["TCS"])
+
+    assert client.calls == 2
+    service.shutdown()
+
+
+def test_slow_client_times_out_with_an_error_result():
+    client = StubClient(delay=5)
+    service = ForecastService(client, limiter=fast_limiter(), timeout=0.2, save=False)
+
+    start = time.time()
+    service.submit("TCS", rows())
+    wait_idle(service, ["TCS"])
+
+    result = service.latest("TCS")
+    assert time.time() - start < 2
+    assert result.status == "error"
+    assert "TimeoutError" in result.error
+    service.shutdown()
+
+
+def test_token_bucket_limits_throughput():
+    bucket = TokenBucket(rate=20, capacity=1)
+    start = time.monotonic()
+    for _ in range(6):
+        assert bucket.acquire(timeout=1)
+    # First token is free, the other five arrive at 20/s
+    assert time.monotonic() - start >= 5 / 20 * 0.9
+
+
+def test_rate_limited_requests_fail_after_timeout():
+    client = StubClient()
+    limiter = TokenBucket(rate=0.01, capacity=1)
+    service = ForecastService(
+        client, workers=2, limiter=limiter, timeout=0.2, save=False
+    )
+
+    service.submit("TCS", rows())
+    service.submit("INFY", rows())
+    wait_idle(service, ["TCS", "INFY"])
+
+    statuses = sorted(service.latest(s).status for s in ("TCS", "INFY"))
+    assert statuses == ["done", "error"]
+    assert client.calls == 1
+    service.shutdown()
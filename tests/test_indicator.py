@@ -0,0 +1,88 @@
+# tests/test_indicator.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from history import available_codes, load_minute_bars, load_panel
+from indicator import (
+    INDICATOR_COLUMNS,
+    IncrementalIndicators,
+    add_indicators,
+    add_indicators_panel,
+    panel_symbol,
+)
+
+CONFIG = {
+    "moving_averages": {"ma_fast": 9, "ma_slow": 21},
+    "bollinger": {"period": 20, "std_dev": 2.0},
+    "macd": {"fast_period": 12, "slow_period": 26, "signal_period": 9},
+    "adx": {"period": 14},
+}
+
+
+def random_walk(n=2000, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 1000 + np.cumsum(rng.normal(0, 1.5, n))
+    spread = rng.uniform(0, 2, n)
+    return pd.DataFrame(
+        {"High": close + spread, "Low": close - spread, "Close": close.round(2)}
+    )
+
+
+def flat(n=300):
+    # No range at all: TR is 0, so +DI/-DI/DX hit the 0/0 -> NaN path
+    return pd.DataFrame({"High": [500.0] * n, "Low": [500.0] * n, "Close": [500.0] * n})
+
+
+def stock_csv():
+    return load_minute_bars("TCS")[["High", "Low", "Close"]].reset_index(drop=True)
+
+
+@pytest.mark.parametrize("make_bars", [stock_csv, random_walk, flat])
+def test_incremental_matches_add_indicators(make_bars):
+    bars = make_bars()
+    expected = add_indicators(bars.copy(), CONFIG)
+
+    engine = IncrementalIndicators(CONFIG)
+    rows = [
+        engine.update(high, low, close)
+        for high, low, close in zip(bars["High"], bars["Low"], bars["Close"])
+    ]
+    actual = pd.DataFrame(rows, columns=INDICATOR_COLUMNS)
+
+    for column in INDICATOR_COLUMNS:
+        assert np.allclose(
+            actual[column].to_numpy(dtype=float),
+            expected[column].to_numpy(dtype=float),
+            rtol=1e-9,
+            atol=1e-9,
+            equal_nan=True,
+        ), column
+    assert engine.last == rows[-1]
+
+
+def test_panel_matches_add_indicators_per_symbol():
+    result = add_indicators_panel(load_panel(), CONFIG)
+
+    for code in available_codes():
+        bars = load_minute_bars(code)
+        expected = add_indicators(bars.copy(), CONFIG)
+        actual = panel_symbol(result, code)
+
+        assert len(actual) == len(bars), code
+        assert (actual["Timestamp"].to_numpy() == bars["Timestamp"].to_numpy()).all()
+        for column in ["Close", *INDICATOR_COLUMNS]:
+            assert np.allclose(
+                actual[column].to_numpy(dtype=float),
+                expected[column].to_numpy(dtype=float),
+                rtol=1e-9,
+                atol=1e-9,
+                equal_nan=True,
+            ), (code, column)
+
+
+def test_matches_tracks_settings():
+    engine = IncrementalIndicators(CONFIG)
+    assert engine.matches(dict(CONFIG))
+    assert not engine.matches({**CONFIG, "adx": {"period": 20}})
@@ -0,0 +1,55 @@
+# tick_store.py
+
+import numpy as np
+import pandas as pd
+
+
+class TickStore:
+    """Preallocated columnar rolling window: one NumPy array per field.
+
+    Appends write into a circular index, so adding a tick never copies the
+    window; a DataFrame is only built when to_frame() is called.
+    """
+
+    def __init__(self, dtype, capacity=500):
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self.arrays = {
+            name: np.zeros(capacity, dtype=self.dtype[name]) for name in self.dtype.names
+        }
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def clear(self):
+        self.count = 0
+
+    def append(self, row):
+        i = self.count % self.capacity
+        for name, value in row.items():
+            self.arrays[name][i] = value
+        self.count += 1
+
+    def _order(self, array, n):
+        # Oldest-first copy of the newest n values: at most two slices, so
+        # the cost follows n rather than the capacity
+        head = self.count % self.capacity
+        start = head - n
+        if start >= 0:
+            return array[start:head].copy()
+        return np.concatenate((array[start:], array[:head]))
+
+    def column(self, name, n=None):
+        size = len(self)
+        n = size if n is None else min(n, size)
+        return self._order(self.arrays[name], n)
+
+    def last(self, name):
+        return self.arrays[name][(self.count - 1) % self.capacity]
+
+    def columns(self, n=None):
+        return {name: self.column(name, n) for name in self.arrays}
+
+    def to_frame(self, n=None):
+        return pd.DataFrame(self.columns(n))